@@ -14,13 +14,24 @@
 ####################################################################################################
 
 
-from flask import Flask, jsonify
+from flask import Flask
 from supabase import create_client, Client
+from postgrest.utils import SyncClient
+from postgrest.exceptions import APIError
 from dotenv import load_dotenv
-from fuzzywuzzy import process  # type: ignore
+from rapidfuzz import fuzz, process, utils
+from cachetools import TTLCache, cached  # type: ignore
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, wait
+import logging
 import os
 import re
+import string
+import threading
+import time
 import functions_framework
+import httpx
+import orjson
 import yagmail  # type: ignore
 
 app = Flask(__name__)
@@ -31,13 +42,78 @@ SUPABASE_URL = os.environ["SUPABASE_URL"]
 SUPABASE_KEY = os.environ["SUPABASE_KEY"]
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
+# Connection pool for the shared PostgREST session. The client lives at module scope, so warm
+# function invocations reuse open keep-alive connections instead of repeating the TLS handshake.
+POSTGREST_POOL_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=100)
+# Negotiate HTTP/2 so concurrent lookups are multiplexed over one connection rather than each
+# opening its own. Falls back to HTTP/1.1 if the server does not offer it.
+POSTGREST_HTTP2 = True
+
+
+def _pool_postgrest_connections(client, limits, http2=False):
+    """
+    Replaces the PostgREST session of a Supabase client with one using the given pool limits,
+        keeping its base URL, auth headers and timeout.
+
+    Args:
+        client (Client): The Supabase client whose table and RPC requests should be pooled.
+        limits (httpx.Limits): The keep-alive and connection limits for the new session.
+        http2 (bool, optional): Whether the new session should negotiate HTTP/2.
+    """
+    session = client.postgrest.session
+    client.postgrest.session = SyncClient(
+        base_url=session.base_url,
+        headers=session.headers,
+        timeout=session.timeout,
+        limits=limits,
+        http2=http2,
+    )
+    session.close()
+
+
+_pool_postgrest_connections(supabase, POSTGREST_POOL_LIMITS, POSTGREST_HTTP2)
+
+
+def _warm_supabase_pool():
+    """
+    Issues a trivial zero-row query so the first real request of a new function instance does not
+        pay for opening the connection. Failures are ignored, since the request path reconnects anyway.
+    """
+    try:
+        supabase.table("venues").select("user_id").limit(0).execute()
+    except Exception:
+        pass
+
+
+# Cloud Functions sets FUNCTION_TARGET; skip the network call when imported locally or in tests
+if os.environ.get("FUNCTION_TARGET"):
+    _warm_supabase_pool()
+
 
 # Schema for request validation
 object_types = ["venue", "artist", "attendee", "event", "ticket"]
 account_types = [ot for ot in object_types if ot not in ["event", "ticket"]]
 non_account_types = [ot for ot in object_types if ot not in account_types]
+# Supabase table holding each object type, spelled out so no table name is derived at runtime
+_TABLE_NAMES = {
+    "venue": "venues",
+    "artist": "artists",
+    "attendee": "attendees",
+    "event": "events",
+    "ticket": "tickets",
+}
+assert _TABLE_NAMES.keys() == set(object_types)
+# Hashed membership sets for the per-request checks in validate_request
+_FUNCTIONS = frozenset({"get", "create", "update", "delete"})
+_ACCOUNT_TYPES = frozenset(account_types)
+_NON_ACCOUNT_TYPES = frozenset(non_account_types)
+# Rejection message for each object type managed by another API, built once at import
+_NON_ACCOUNT_MESSAGES = {
+    ot: f"Management of {_TABLE_NAMES[ot]} is handled by a separate API."
+    for ot in non_account_types
+}
 attributes_schema = {
-    "venue": [
+    "venue": (
         "user_id",
         "venue_name",
         "email",
@@ -46,8 +122,8 @@ attributes_schema = {
         "postcode",
         "bio",
         "status",
-    ],
-    "artist": [
+    ),
+    "artist": (
         "user_id",
         "artist_name",
         "email",
@@ -58,8 +134,8 @@ attributes_schema = {
         "spotify_artist_id",
         "bio",
         "status",
-    ],
-    "attendee": [
+    ),
+    "attendee": (
         "user_id",
         "first_name",
         "last_name",
@@ -69,8 +145,8 @@ attributes_schema = {
         "postcode",
         "bio",
         "status",
-    ],
-    "event": [
+    ),
+    "event": (
         "event_id",
         "venue_id",
         "event_name",
@@ -79,28 +155,93 @@ attributes_schema = {
         "sold_tickets",
         "artist_ids",
         "status",
-    ],
-    "ticket": ["ticket_id", "event_id", "attendee_id", "price", "redeemed", "status"],
+    ),
+    "ticket": ("ticket_id", "event_id", "attendee_id", "price", "redeemed", "status"),
+}
+# Attribute sets derived from the schema once at import, rather than rebuilt on every request
+_OPTIONAL_ATTRIBUTES = frozenset({"spotify_artist_id", "bio", "status"})
+_ALLOWED_ATTRIBUTES = {
+    ot: frozenset(attributes) for ot, attributes in attributes_schema.items()
+}
+_REQUIRED_ATTRIBUTES = {
+    ot: allowed - _OPTIONAL_ATTRIBUTES for ot, allowed in _ALLOWED_ATTRIBUTES.items()
 }
+_NO_ATTRIBUTES: frozenset = frozenset()
 # Attribute keys are paired with boolean values for get requests, or the value to be added to the
 # database otherwise.
 request_template = ["function", "object_type", "identifier", "attributes"]
 
+# Window (in seconds) for which account-existence lookups are served from memory
+ACCOUNT_CACHE_TTL = 30
+# Window (in seconds) for which the artist candidates for a search term are reused
+ARTIST_CACHE_TTL = 60
+# Number of closest artists by trigram distance that are reranked by fuzzy matching
+ARTIST_CANDIDATE_LIMIT = 50
+
+# Shared pool for overlapping independent Supabase lookups in bulk requests
+BULK_LOOKUP_WORKERS = 8
+_lookup_pool = ThreadPoolExecutor(max_workers=BULK_LOOKUP_WORKERS)
+# Most IDs accepted by one bulk lookup request, so a single caller cannot monopolise the pool
+BULK_LOOKUP_LIMIT = 100
+
+# Most accounts accepted by one bulk create request, since each created account is sent an email
+BULK_CREATE_LIMIT = 25
+
+# Confirmation emails are sent on a small pool so the sends for a bulk create overlap; callers still
+# wait for them, as Cloud Functions do not guarantee CPU once the response has been returned
+EMAIL_WORKERS = 2
+_email_pool = ThreadPoolExecutor(max_workers=EMAIL_WORKERS)
+
+# Compiled once at import so the validation hot path reuses a single Pattern object
+_EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+# Characters allowed in a Spotify ID, checked as a C-level set containment rather than a regex
+_SPOTIFY_ID_CHARS = frozenset(string.ascii_letters + string.digits + "-_")
+
 
 def send_confirmation_email(recipient_email):
     sender_email = os.environ["BUSINESS_EMAIL"]
     subject = "Welcome To Jumpstart Events"
     app_password = os.environ["APP_PASSWORD"]
 
-    yag = yagmail.SMTP(user=sender_email, password=app_password)
-
     contents = [
         f"Hey {recipient_email}\n"
         + "Welcome to Jumpstart Events, we are thrilled that you have chosen us!\n\n"
         + "Your Jumpstart Events Team"
     ]
 
-    yag.send(recipient_email, subject, contents)
+    # yagmail logs in afresh on every send, so a shared client would not save the handshake; close
+    # the connection once sent rather than leaving it open until garbage collection
+    with yagmail.SMTP(user=sender_email, password=app_password) as yag:
+        yag.send(recipient_email, subject, contents)
+
+
+def _send_confirmation_email_logged(recipient_email):
+    """
+    Runs send_confirmation_email, logging any failure before it is stored on the Future so that it
+        is recorded even though callers only wait for the send rather than read its result.
+
+    Args:
+        recipient_email (str): The address the confirmation email is sent to.
+    """
+    try:
+        send_confirmation_email(recipient_email)
+    except Exception:
+        logging.exception("Failed to send confirmation email to %s", recipient_email)
+        raise
+
+
+def queue_confirmation_email(recipient_email):
+    """
+    Schedules the confirmation email on the email pool and returns immediately, so several sends
+        can be in flight at once. Callers must wait for the returned Future before responding.
+
+    Args:
+        recipient_email (str): The address the confirmation email is sent to.
+
+    Returns:
+        The Future for the send, which raises any error from sending when its result is requested.
+    """
+    return _email_pool.submit(_send_confirmation_email_logged, recipient_email)
 
 
 def is_valid_email(email):
@@ -113,8 +254,47 @@ def is_valid_email(email):
     Returns:
         True if the string is a valid email address, else false.
     """
-    pattern = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
-    return re.match(pattern, email) is not None
+    # Cheap prefilters reject most malformed input before the regex engine is involved. 254 is the
+    # longest address SMTP allows, and "a@b.cc" is the shortest one the regex accepts.
+    if not (6 <= len(email) <= 254) or email.count("@") != 1:
+        return False
+
+    return _EMAIL_RE.fullmatch(email) is not None
+
+
+@cached(
+    TTLCache(maxsize=2048, ttl=ACCOUNT_CACHE_TTL),
+    lock=threading.Lock(),
+)
+def _check_account_exists_rpc(google_auth_id):
+    """
+    Runs the check_account_exists Supabase RPC. Results are memoised so repeated lookups of the same
+        ID within ACCOUNT_CACHE_TTL seconds skip the network round-trip.
+
+    Args:
+        google_auth_id (str): The Google Authentication ID being checked.
+
+    Returns:
+        A list of matching account rows returned by Supabase (empty if none exist).
+    """
+    data = supabase.rpc(
+        "check_account_exists", {"google_auth_id": google_auth_id}
+    ).execute()
+    return data.data
+
+
+def forget_account_lookup(google_auth_id):
+    """
+    Drops any memoised check_account_exists result for an ID, so the next lookup after an account is
+        created, updated or deactivated reflects the change rather than a stale cached answer.
+
+    Args:
+        google_auth_id (str): The Google Authentication ID whose cached lookup should be discarded.
+    """
+    with _check_account_exists_rpc.cache_lock:
+        _check_account_exists_rpc.cache.pop(
+            _check_account_exists_rpc.cache_key(google_auth_id), None
+        )
 
 
 def check_email_in_use(google_auth_id):
@@ -132,14 +312,12 @@ def check_email_in_use(google_auth_id):
         if not is_valid_auth_id(google_auth_id):
             return {"error": "Invalid Google Authentication ID format."}
 
-        # Execute the check_account_exists Supabase RPC
-        data = supabase.rpc(
-            "check_account_exists", {"google_auth_id": google_auth_id}
-        ).execute()
+        # Execute the check_account_exists Supabase RPC (cached for a short window)
+        rows = _check_account_exists_rpc(google_auth_id)
 
-        if data.data:
+        if rows:
             # Found an entry, return account information
-            return {**data.data[0], "message": "Account exists."}
+            return {**rows[0], "message": "Account exists."}
         else:
             # If no data is found, the account does not exist
             return {"message": "Account does not exist."}
@@ -147,6 +325,22 @@ def check_email_in_use(google_auth_id):
         return {"error": f"An error occurred: {str(e)}"}
 
 
+def check_emails_in_use(google_auth_ids):
+    """
+    Checks several Google Authentication IDs for existing accounts, running the Supabase lookups
+        concurrently rather than one after another.
+
+    Args:
+        google_auth_ids (list): The Google Authentication IDs being checked.
+
+    Returns:
+        A dictionary mapping each distinct ID to the result of check_email_in_use for that ID.
+    """
+    unique_ids = list(dict.fromkeys(google_auth_ids))
+    results = _lookup_pool.map(check_email_in_use, unique_ids)
+    return dict(zip(unique_ids, results))
+
+
 def is_valid_auth_id(identifier):
     """
     Checks if a string is a valid Google account ID.
@@ -162,15 +356,16 @@ def is_valid_auth_id(identifier):
     Returns:
         bool: True if the identifier is a valid Google account ID, else False.
     """
-    # Check if the identifier is purely numeric
-    if not identifier.isdigit():
+    # Non-string identifiers (e.g. a JSON number) are rejected rather than raising
+    if not isinstance(identifier, str):
         return False
 
-    # Adjust length range as appropriate.
+    # Adjust length range as appropriate. Checked first, as it rejects long junk without a scan.
     if not (10 <= len(identifier) <= 21):
         return False
 
-    return True
+    # Check the identifier is purely numeric. isdigit alone also accepts non-ASCII digits.
+    return identifier.isascii() and identifier.isdigit()
 
 
 def is_valid_spotify_user_id(identifier):
@@ -187,18 +382,16 @@ def is_valid_spotify_user_id(identifier):
     Returns:
         bool: True if the identifier is a valid Spotify user ID, else False.
     """
-    # Define the pattern for a valid Spotify user ID: alphanumeric, hyphens, and underscores
-    pattern = r"^[a-zA-Z0-9-_]+$"
-
-    # Check if the identifier matches the pattern
-    if not re.match(pattern, identifier):
+    # Non-string identifiers (e.g. a JSON number) are rejected rather than raising
+    if not isinstance(identifier, str):
         return False
 
     # Need to tweak range as necessary -- seems reasonable for now
     if not (8 <= len(identifier) <= 32):
         return False
 
-    return True
+    # Check the identifier is only alphanumerics, hyphens, and underscores
+    return _SPOTIFY_ID_CHARS.issuperset(identifier)
 
 
 def validate_request(request):
@@ -219,30 +412,21 @@ def validate_request(request):
     identifier = request.get("identifier")
 
     # Validate function
-    if function not in ["get", "create", "update", "delete"]:
+    if function not in _FUNCTIONS:
         return False, "Invalid function specified."
 
     # Validate object type
-    if object_type in non_account_types:
-        return False, f"Management of {object_type + 's'} is handled by a separate API."
-    elif object_type not in account_types:
+    if object_type in _NON_ACCOUNT_TYPES:
+        return False, _NON_ACCOUNT_MESSAGES[object_type]
+    elif object_type not in _ACCOUNT_TYPES:
         return False, f"Invalid object type. Must be one of {account_types}."
 
     # Validate identifier based on object_type
     if not is_valid_auth_id(identifier):
         return False, "Invalid or missing unique ID."
 
-    # Delegate to specific validation functions based on the function type
-    if function == "get":
-        return validate_get_request(request)
-    elif function == "create":
-        return validate_create_request(request)
-    elif function == "update":
-        return validate_update_request(request)
-    elif function == "delete":
-        return validate_delete_request(request)
-
-    return True, "Request is valid."
+    # Delegate to the specific validation function for the function type
+    return _REQUEST_VALIDATORS[function](request)
 
 
 def extract_and_prepare_attributes(request):
@@ -262,44 +446,57 @@ def extract_and_prepare_attributes(request):
     attributes = request.get("attributes", {})
     object_type = request.get("object_type")
 
-    # Filter for objects that can be modified (user_id is uuid assigned by Supabase)
-    validation_attributes = {k: v for k, v in attributes.items() if k}
+    # Drop the blank attribute name, only copying the dict when there is one to remove
+    validation_attributes = attributes
+    if "" in attributes:
+        validation_attributes = attributes.copy()
+        del validation_attributes[""]
 
     return object_type, validation_attributes
 
 
-def check_for_extra_attributes(validation_attributes, object_type):
+def _check_attributes(validation_attributes, object_type, require_all):
     """
-    Checks for requests asking for attributes that are not in the table/should not be available to
-    the user.
+    Validates request attributes against the schema in a single pass over the request, shared by
+        the create and update checks.
 
     Args:
-        object_type (str): One of the five types of object being stored in the database,
-            ['venue', 'artist', 'attendee', 'event', 'ticket'].
         validation_attributes (dict): The attributes of that object being queried in the database.
+        object_type (str): One of the five types of object being stored in the database.
+        require_all (bool): Whether every required attribute of the object type must be present.
 
     Returns:
-        A tuple (bool, str) containing True and an empty string if no additional attributes are
-            present, or False and an error message otherwise.
+        A tuple (bool, str) containing True and an empty string if the attributes are valid, or
+            False and an error message otherwise.
     """
-    # Identify attributes required for the function
-    total_attributes = set(attributes_schema.get(object_type, []))
+    total_attributes = _ALLOWED_ATTRIBUTES.get(object_type, _NO_ATTRIBUTES)
 
-    # Guard against non-defined attributes
-    undefined_attributes = [
-        key for key in validation_attributes.keys() if key not in total_attributes
-    ]
+    # Collect non-defined attributes and attributes with empty values in a single pass
+    undefined_attributes = []
+    empty_value_attributes = []
+    for key, value in validation_attributes.items():
+        if key not in total_attributes:
+            undefined_attributes.append(key)
+        elif value == "":
+            empty_value_attributes.append(key)
 
+    # Guard against non-defined attributes
     if undefined_attributes:
         message = "Additional, undefined attributes cannot be specified: "
-        message += ", ".join(undefined_attributes) + ". "
+        message += ", ".join(undefined_attributes) + "."
         return False, message
 
-    # Check for attributes with empty values
-    empty_value_attributes = [
-        key for key, value in validation_attributes.items() if value == ""
-    ]
+    # Check for missing required attributes, sorted so the message does not depend on set order.
+    # The subset test against the keys view allocates nothing, so the difference is only built
+    # when something is actually missing
+    if require_all:
+        required_attributes = _REQUIRED_ATTRIBUTES.get(object_type, _NO_ATTRIBUTES)
+        if not required_attributes <= validation_attributes.keys():
+            missing_attributes = required_attributes.difference(validation_attributes)
+            missing_attributes_str = ", ".join(sorted(missing_attributes))
+            return False, f"Missing required attributes: {missing_attributes_str}."
 
+    # Check for attributes with empty values
     if empty_value_attributes:
         empty_value_attributes_str = ", ".join(empty_value_attributes)
         return (
@@ -310,6 +507,23 @@ def check_for_extra_attributes(validation_attributes, object_type):
     return True, ""
 
 
+def check_for_extra_attributes(validation_attributes, object_type):
+    """
+    Checks for requests asking for attributes that are not in the table/should not be available to
+    the user.
+
+    Args:
+        object_type (str): One of the five types of object being stored in the database,
+            ['venue', 'artist', 'attendee', 'event', 'ticket'].
+        validation_attributes (dict): The attributes of that object being queried in the database.
+
+    Returns:
+        A tuple (bool, str) containing True and an empty string if no additional attributes are
+            present, or False and an error message otherwise.
+    """
+    return _check_attributes(validation_attributes, object_type, require_all=False)
+
+
 def check_required_attributes(validation_attributes, object_type):
     """
     Checks whether the request describes the treatment of all attributes needed to create a new
@@ -324,44 +538,7 @@ def check_required_attributes(validation_attributes, object_type):
         A tuple (bool, str) of True and no message if all required attribute keys are specified,
             or False and an error message if not.
     """
-    # Identify attributes required for the function
-    total_attributes = set(attributes_schema.get(object_type, []))
-    required_attributes = (
-        total_attributes - {"spotify_artist_id"} - {"bio"} - {"status"}
-    )
-
-    # Guard against non-defined attributes
-    undefined_attributes = [
-        key for key in validation_attributes.keys() if key not in total_attributes
-    ]
-
-    if undefined_attributes:
-        message = "Additional, undefined attributes cannot be specified: "
-        message += ", ".join(undefined_attributes) + "."
-        return False, message
-
-    # Check for missing required attributes
-    missing_attributes = [
-        key for key in required_attributes if key not in validation_attributes
-    ]
-
-    if missing_attributes:
-        missing_attributes_str = ", ".join(missing_attributes)
-        return False, f"Missing required attributes: {missing_attributes_str}."
-
-    # Check for attributes with empty values
-    empty_value_attributes = [
-        key for key, value in validation_attributes.items() if value == ""
-    ]
-
-    if empty_value_attributes:
-        empty_value_attributes_str = ", ".join(empty_value_attributes)
-        return (
-            False,
-            f"Cannot specify attributes with empty values: {empty_value_attributes_str}.",
-        )
-
-    return True, ""
+    return _check_attributes(validation_attributes, object_type, require_all=True)
 
 
 def get_account_info(request):
@@ -379,17 +556,18 @@ def get_account_info(request):
     if not valid:
         return {"error": message}
 
-    account_type = request.get("object_type")
+    # Validation guarantees at least one attribute is queried and that every queried value is true
+    account_type, queried_attributes = extract_and_prepare_attributes_for_get(request)
     user_id = request["identifier"]
-    attributes_to_fetch = [
-        attr for attr, include in request.get("attributes", {}).items() if include
-    ]
 
     try:
+        # user_id is unique, so stop after the first row. maybe_single is avoided because it
+        # replaces every PostgREST error with a generic "Missing response"
         data = (
-            supabase.table(account_type + "s")
-            .select(", ".join(attributes_to_fetch))
+            supabase.table(_TABLE_NAMES[account_type])
+            .select(",".join(queried_attributes))
             .eq("user_id", user_id)
+            .limit(1)
             .execute()
         )
         if data.data:
@@ -468,10 +646,10 @@ def validate_queried_attributes(queried_attributes, object_type):
         A tuple (bool, str) of True and no message if the queried attributes match, and False and an
             error message if not.
     """
-    valid_attributes = attributes_schema.get(object_type, [])
-    if object_type in non_account_types:
-        return False, f"Management of {object_type + 's'} is handled by a separate API."
-    if object_type not in account_types:
+    valid_attributes = _ALLOWED_ATTRIBUTES.get(object_type, _NO_ATTRIBUTES)
+    if object_type in _NON_ACCOUNT_TYPES:
+        return False, _NON_ACCOUNT_MESSAGES[object_type]
+    if object_type not in _ACCOUNT_TYPES:
         return (
             False,
             "Invalid object type. Must be one of ['venue', 'artist', 'attendee'].",
@@ -506,15 +684,12 @@ def create_account(request):
     if not valid:
         return None, validation_message
 
-    object_type = request["object_type"]
-    attributes = request["attributes"]
-
-    # Construct the data to insert. Supabase automatically assigns a UUID.
-    data_to_insert = {key: value for key, value in attributes.items()}
+    # Insert the attributes exactly as validated, without copying them again
+    object_type, data_to_insert = extract_and_prepare_attributes(request)
 
     try:
         result, error = (
-            supabase.table(object_type + "s").insert(data_to_insert).execute()
+            supabase.table(_TABLE_NAMES[object_type]).insert(data_to_insert).execute()
         )
 
         # Since 'result' and 'error' are tuples, unpack them correctly
@@ -524,7 +699,9 @@ def create_account(request):
         # Check the content of the 'result' tuple
         if result_key == "data" and result_value:
             user_id = result_value[0].get("user_id")
-            send_confirmation_email(attributes["email"])
+            forget_account_lookup(request["identifier"])
+            # Finish sending before responding; a failed send is logged, not reported to the caller
+            wait([queue_confirmation_email(data_to_insert["email"])])
             return user_id, "Account creation was successful."
         elif error_value:
             # Now checking the error_value for actual error content
@@ -547,7 +724,7 @@ def validate_create_request(request):
     """
     object_type, validation_attributes = extract_and_prepare_attributes(request)
 
-    # Check that requirements are met
+    # Check that requirements are met, which also rejects any specified attribute left empty
     valid, message = check_required_attributes(validation_attributes, object_type)
     if not valid:
         return False, message
@@ -559,13 +736,69 @@ def validate_create_request(request):
         of characters following https://open.spotify.com/artist/"
         return False, message
 
-    # Check every specified attribute has a value
-    if any(value == "" for value in validation_attributes.values()):
-        return False, "Every specified attribute must have a value."
-
     return True, "Request is valid."
 
 
+def bulk_create_accounts(create_requests):
+    """
+    Creates several accounts with one Supabase insert per object type and attribute set, rather
+        than one round-trip per account.
+
+    Args:
+        create_requests (list): Dictionaries each following the request template for a create.
+
+    Returns:
+        A list of (user_id, message) tuples in the same order as the requests, where user_id is None
+            for any account that was not created.
+    """
+    results = [None] * len(create_requests)
+    groups = {}
+    confirmation_emails = []
+
+    # Validate each request individually, grouping the valid ones by destination table and by the
+    # set of attributes given. PostgREST rejects an array insert whose objects have different keys,
+    # and optional attributes mean valid rows for one table need not share them
+    for index, request in enumerate(create_requests):
+        valid, validation_message = validate_request(request)
+        if not valid:
+            results[index] = (None, validation_message)
+        else:
+            object_type, attributes = extract_and_prepare_attributes(request)
+            group_key = (object_type, frozenset(attributes))
+            groups.setdefault(group_key, []).append(index)
+
+    for (object_type, _), indices in groups.items():
+        rows = [
+            extract_and_prepare_attributes(create_requests[index])[1]
+            for index in indices
+        ]
+        try:
+            result = supabase.table(_TABLE_NAMES[object_type]).insert(rows).execute()
+        except Exception as e:
+            # The insert is a single statement, so the whole group fails together
+            for index in indices:
+                results[index] = (None, f"An exception occurred: {str(e)}")
+            continue
+
+        if len(result.data) != len(rows):
+            for index in indices:
+                results[index] = (
+                    None,
+                    "Unexpected response: No data returned after insert.",
+                )
+            continue
+
+        # PostgREST returns the inserted rows in the order they were sent
+        for index, attributes, row in zip(indices, rows, result.data):
+            forget_account_lookup(create_requests[index]["identifier"])
+            confirmation_emails.append(queue_confirmation_email(attributes["email"]))
+            results[index] = (row.get("user_id"), "Account creation was successful.")
+
+    # Let the sends overlap, but finish them all before responding
+    wait(confirmation_emails)
+    return results
+
+
 def update_account(request):
     """
     Updates an account in the Supabase database based on the request parameters.
@@ -580,14 +813,16 @@ def update_account(request):
     if not valid:
         return False, validation_message
 
-    object_type = request["object_type"]
+    object_type, attributes = extract_and_prepare_attributes(request)
     identifier = request["identifier"]
-    attributes = request["attributes"]
 
-    # Filter out attributes with no value provided
-    data_to_update = {
-        key: value for key, value in attributes.items() if value is not None
-    }
+    # Filter out attributes with no value provided, only copying the dict when there is one to drop
+    if any(value is None for value in attributes.values()):
+        data_to_update = {
+            key: value for key, value in attributes.items() if value is not None
+        }
+    else:
+        data_to_update = attributes
 
     if not data_to_update:
         return False, "No valid attributes provided for update."
@@ -595,7 +830,7 @@ def update_account(request):
     try:
         # Update the record in the specified table
         query = (
-            supabase.table(object_type + "s")
+            supabase.table(_TABLE_NAMES[object_type])
             .update(data_to_update)
             .eq("user_id", identifier)
         )
@@ -603,6 +838,7 @@ def update_account(request):
 
         # Check if the update was successful
         if result.data:
+            forget_account_lookup(identifier)
             # Compare the updated attributes to the expected values
             updated_attributes = result.data[0]
             if all(
@@ -668,7 +904,7 @@ def delete_account(request):
     try:
         # Update the status of the record to 'Inactive'
         result = (
-            supabase.table(object_type + "s")
+            supabase.table(_TABLE_NAMES[object_type])
             .update({"status": "Inactive"})
             .eq("user_id", identifier)
             .execute()
@@ -676,6 +912,7 @@ def delete_account(request):
 
         # Check the result to determine if the update was successful
         if result.data and len(result.data) > 0:
+            forget_account_lookup(identifier)
             return (
                 True,
                 f"{object_type.capitalize()} account status updated to 'Inactive' successfully.",
@@ -703,6 +940,48 @@ def validate_delete_request(request):
     return True, "Request is valid."
 
 
+# Per-function validators dispatched to by validate_request; keys match _FUNCTIONS
+_REQUEST_VALIDATORS = {
+    "get": validate_get_request,
+    "create": validate_create_request,
+    "update": validate_update_request,
+    "delete": validate_delete_request,
+}
+assert _REQUEST_VALIDATORS.keys() == _FUNCTIONS
+
+
+@lru_cache(maxsize=1024)
+def _artist_candidates(query, time_bucket):
+    """
+    Runs the search_artists_trgm Supabase RPC, which orders artists by pg_trgm distance to the query
+        and returns only the closest ARTIST_CANDIDATE_LIMIT rows, so the full artists table is never
+        sent over the wire. If the RPC has not been created in the database, every artist is
+        fetched instead and reranked in full. Results are memoised per time bucket, so repeated
+        searches for the same term within ARTIST_CACHE_TTL seconds skip the network round-trip.
+
+    Args:
+        query (str): The normalised search term.
+        time_bucket (int): The current TTL window, only used as part of the cache key.
+
+    Returns:
+        A tuple (list, list, list) of the candidate artist names, their normalised forms and their
+            user IDs, all in the same order.
+    """
+    try:
+        data = supabase.rpc(
+            "search_artists_trgm", {"q": query, "k": ARTIST_CANDIDATE_LIMIT}
+        ).execute()
+    except APIError as e:
+        # PGRST202: the function does not exist, so fall back to scanning the artists table
+        if e.code != "PGRST202":
+            raise
+        data = supabase.table("artists").select("user_id, artist_name").execute()
+    artist_names = [artist["artist_name"] for artist in data.data]
+    processed_names = [utils.default_process(name) for name in artist_names]
+    user_ids = [artist["user_id"] for artist in data.data]
+    return artist_names, processed_names, user_ids
+
+
 def find_artist_by_name(search_term: str, threshold=75):
     """
     Searches for an artist by name within the database, using fuzzy string matching to accommodate
@@ -731,34 +1010,73 @@ def find_artist_by_name(search_term: str, threshold=75):
         >>> find_artist_by_name("Unknown Artist")
         None
     """
-    # Fetch artist names and user_ids from the database
-    data = supabase.table("artists").select("user_id, artist_name").execute()
-    artist_info = [(artist["artist_name"], artist["user_id"]) for artist in data.data]
-
-    # Convert list of tuples to just names for fuzzy matching, retaining order
-    artist_names = [info[0] for info in artist_info]
+    query = utils.default_process(search_term)
+    if not query:
+        # Nothing left to match on once normalised, so no artist can meet the threshold
+        return None
+
+    # Prefilter server-side to the closest candidates by trigram distance, then rerank only those
+    artist_names, processed_names, user_ids = _artist_candidates(
+        query, int(time.time()) // ARTIST_CACHE_TTL
+    )
 
-    # Use fuzzy matching to find the closest match to the search_term
-    best_match, score = process.extractOne(search_term, artist_names)
+    # Use fuzzy matching to find the closest match to the search_term, letting RapidFuzz discard
+    # candidates below the threshold as it goes.
+    match = process.extractOne(
+        query,
+        processed_names,
+        scorer=fuzz.WRatio,
+        processor=None,
+        score_cutoff=threshold,
+    )
 
-    if score >= threshold:
-        # Find the user_id for the best match
-        matched_artist = next(
-            (info for info in artist_info if info[0] == best_match), None
-        )
-        if matched_artist:
-            # Return both artist_name and user_id
-            return {"artist_name": matched_artist[0], "user_id": matched_artist[1]}
+    if match:
+        # extractOne also returns the index of the match, so the user_id is a direct lookup
+        index = match[2]
+        return {"artist_name": artist_names[index], "user_id": user_ids[index]}
     return None
 
 
+def _parse_json(request):
+    """
+    Parses a JSON request body with orjson, which is considerably faster than the standard library
+        decoder behind request.get_json.
+
+    Args:
+        request: The incoming Flask request.
+
+    Returns:
+        The decoded payload, or None if the request is not JSON or its body cannot be parsed.
+    """
+    if not request.is_json:
+        return None
+    try:
+        return orjson.loads(request.get_data(cache=True))
+    except orjson.JSONDecodeError:
+        return None
+
+
+def _json_response(payload):
+    """
+    Serialises a response body with orjson, which is considerably faster than the standard library
+        encoder behind flask.jsonify.
+
+    Args:
+        payload: A JSON-serialisable dictionary or list.
+
+    Returns:
+        A Flask response with an application/json body, to be paired with a status code.
+    """
+    return app.response_class(orjson.dumps(payload), mimetype="application/json")
+
+
 @functions_framework.http
 def api_check_email_in_use(request):
-    req_data = request.get_json()
+    req_data = _parse_json(request)
 
     # Check that an email string has been received
     if not req_data or "id" not in req_data:
-        return jsonify({"error": "Invalid or missing id in JSON payload"}), 400
+        return _json_response({"error": "Invalid or missing id in JSON payload"}), 400
 
     # Function call
     id = req_data["id"]
@@ -767,31 +1085,56 @@ def api_check_email_in_use(request):
     # Handle the possible outcomes
     if "error" in result:
         # Return 500 status code (internal server error)
-        return jsonify(result), 500
+        return _json_response(result), 500
     else:
         # Return result of the email check
-        return jsonify(result), 200
+        return _json_response(result), 200
 
 
 @functions_framework.http
-def api_get_account_info(request):
-    req_data = request.get_json()
+def api_check_emails_in_use(request):
+    req_data = _parse_json(request)
+
+    # Check that a list of id strings has been received
+    if (
+        not isinstance(req_data, dict)
+        or not isinstance(req_data.get("ids"), list)
+        or not all(isinstance(id, str) for id in req_data["ids"])
+    ):
+        return _json_response({"error": "Invalid or missing ids in JSON payload"}), 400
+
+    if len(req_data["ids"]) > BULK_LOOKUP_LIMIT:
+        return (
+            _json_response(
+                {"error": f"At most {BULK_LOOKUP_LIMIT} ids can be checked at once"}
+            ),
+            400,
+        )
 
-    # Check a valid payload was received
-    if not req_data:
-        return jsonify({"error": "Invalid or missing JSON payload"}), 400
+    # Function call
+    results = check_emails_in_use(req_data["ids"])
+
+    # Individual lookups report their own errors, so the batch itself succeeds
+    return _json_response(results), 200
 
-    if "function" not in req_data or req_data["function"] != "get":
-        return jsonify({"error": "API only handles get requests"}), 400
 
-    # Call function
+def _get_account_response(req_data):
+    """
+    Runs a get request and shapes the outcome into an HTTP response.
+
+    Args:
+        req_data (dict): The parsed JSON payload, already checked to be a get request.
+
+    Returns:
+        A tuple (Response, int) of the JSON response and its status code.
+    """
     result = get_account_info(req_data)
 
     # Handle outcomes
     if "error" in result:
         # Return 404 if account not found, or 500 for all other errors in reaching the database
         return (
-            jsonify(result),
+            _json_response(result),
             (
                 404
                 if result["error"] == "No account found for the provided email."
@@ -799,74 +1142,189 @@ def api_get_account_info(request):
             ),
         )
 
-    return jsonify(result), 200
-
+    return _json_response(result), 200
 
-@functions_framework.http
-def api_create_account(request):
-    req_data = request.json
 
-    # Check a valid payload was received
-    if not req_data:
-        return jsonify({"error": "Invalid or missing JSON payload"}), 400
+def _create_account_response(req_data):
+    """
+    Runs a create request and shapes the outcome into an HTTP response.
 
-    if "function" not in req_data or req_data["function"] != "create":
-        return jsonify({"error": "API only handles create requests"}), 400
+    Args:
+        req_data (dict): The parsed JSON payload, already checked to be a create request.
 
+    Returns:
+        A tuple (Response, int) of the JSON response and its status code.
+    """
     user_id, message = create_account(req_data)
     if user_id:
-        return jsonify({"user_id": user_id, "message": message}), 200
+        return _json_response({"user_id": user_id, "message": message}), 200
     else:
-        return jsonify({"error": message}), 400
+        return _json_response({"error": message}), 400
 
 
-@functions_framework.http
-def api_update_account(request):
-    req_data = request.json
-
-    if not req_data:
-        return jsonify({"error": "Invalid or missing JSON payload"}), 400
+def _update_account_response(req_data):
+    """
+    Runs an update request and shapes the outcome into an HTTP response.
 
-    if "function" not in req_data or req_data["function"] != "update":
-        return jsonify({"error": "API only handles update requests"}), 400
+    Args:
+        req_data (dict): The parsed JSON payload, already checked to be an update request.
 
+    Returns:
+        A tuple (Response, int) of the JSON response and its status code.
+    """
     success, message = update_account(req_data)
     if success:
-        return jsonify({"message": message}), 200
+        return _json_response({"message": message}), 200
     else:
-        return jsonify({"error": message}), 400
-
+        return _json_response({"error": message}), 400
 
-@functions_framework.http
-def api_delete_account(request):
-    req_data = request.json
 
-    if not req_data:
-        return jsonify({"error": "Invalid or missing JSON payload"}), 400
+def _delete_account_response(req_data):
+    """
+    Runs a delete request and shapes the outcome into an HTTP response.
 
-    if "function" not in req_data or req_data["function"] != "delete":
-        return jsonify({"error": "API only handles delete requests"}), 400
+    Args:
+        req_data (dict): The parsed JSON payload, already checked to be a delete request.
 
+    Returns:
+        A tuple (Response, int) of the JSON response and its status code.
+    """
     success, message = delete_account(req_data)
     if success:
-        return jsonify({"message": message}), 200
+        return _json_response({"message": message}), 200
     else:
-        return jsonify({"error": message}), 400
+        return _json_response({"error": message}), 400
+
+
+# Response builder for each request function, shared by api_account and the per-function endpoints
+_ACCOUNT_RESPONDERS = {
+    "get": _get_account_response,
+    "create": _create_account_response,
+    "update": _update_account_response,
+    "delete": _delete_account_response,
+}
+assert _ACCOUNT_RESPONDERS.keys() == _FUNCTIONS
+
+
+def _handle_account_request(request, function):
+    """
+    Shared body of the single-function endpoints: parses the payload, checks it is a request for the
+        function the endpoint serves and hands it to that function's response builder.
+
+    Args:
+        request: The incoming Flask request.
+        function (str): The one request function the endpoint accepts.
+
+    Returns:
+        A tuple (Response, int) of the JSON response and its status code.
+    """
+    req_data = _parse_json(request)
+
+    # Check a valid payload was received
+    if not req_data:
+        return _json_response({"error": "Invalid or missing JSON payload"}), 400
+
+    if "function" not in req_data or req_data["function"] != function:
+        return (
+            _json_response({"error": f"API only handles {function} requests"}),
+            400,
+        )
+
+    return _ACCOUNT_RESPONDERS[function](req_data)
+
+
+@functions_framework.http
+def api_account(request):
+    req_data = _parse_json(request)
+
+    # Check a valid payload was received
+    if not req_data or not isinstance(req_data, dict):
+        return _json_response({"error": "Invalid or missing JSON payload"}), 400
+
+    # Dispatch on the request function in a single lookup
+    function = req_data.get("function")
+    if not isinstance(function, str) or function not in _ACCOUNT_RESPONDERS:
+        return _json_response({"error": "Invalid function specified."}), 400
+
+    return _ACCOUNT_RESPONDERS[function](req_data)
+
+
+@functions_framework.http
+def api_get_account_info(request):
+    return _handle_account_request(request, "get")
+
+
+@functions_framework.http
+def api_create_account(request):
+    return _handle_account_request(request, "create")
+
+
+@functions_framework.http
+def api_bulk_create_accounts(request):
+    req_data = _parse_json(request)
+
+    # Check a valid payload was received
+    if not isinstance(req_data, dict) or not isinstance(req_data.get("accounts"), list):
+        return (
+            _json_response({"error": "Invalid or missing accounts in JSON payload"}),
+            400,
+        )
+
+    accounts = req_data["accounts"]
+    if len(accounts) > BULK_CREATE_LIMIT:
+        return (
+            _json_response(
+                {
+                    "error": f"At most {BULK_CREATE_LIMIT} accounts can be created at once"
+                }
+            ),
+            400,
+        )
+    if not all(
+        isinstance(account, dict) and account.get("function") == "create"
+        for account in accounts
+    ):
+        return _json_response({"error": "API only handles create requests"}), 400
+
+    results = bulk_create_accounts(accounts)
+    return (
+        _json_response(
+            [
+                (
+                    {"user_id": user_id, "message": message}
+                    if user_id
+                    else {"error": message}
+                )
+                for user_id, message in results
+            ]
+        ),
+        200,
+    )
+
+
+@functions_framework.http
+def api_update_account(request):
+    return _handle_account_request(request, "update")
+
+
+@functions_framework.http
+def api_delete_account(request):
+    return _handle_account_request(request, "delete")
 
 
 @functions_framework.http
 def api_find_artist_by_name(request):
-    query = request.get_json()
+    query = _parse_json(request)
 
     # Check a valid payload was received
     if not query or "search_term" not in query:
-        return jsonify({"error": "Invalid or missing JSON payload"}), 400
+        return _json_response({"error": "Invalid or missing JSON payload"}), 400
 
     matches = find_artist_by_name(query["search_term"])
     if matches:
-        return jsonify(matches), 200
+        return _json_response(matches), 200
     else:
-        return jsonify({"error": "No artists found matching the criteria"}), 404
+        return _json_response({"error": "No artists found matching the criteria"}), 404
 
 
 if __name__ == "__main__":
@@ -14,10 +14,23 @@
 
 
 import unittest
-from unittest.mock import patch, MagicMock
+from contextlib import contextmanager
+from unittest.mock import DEFAULT, patch, MagicMock
+from types import SimpleNamespace
+from concurrent.futures import Future
+from flask import request as flask_request
+import orjson
+from postgrest.exceptions import APIError
+import main as main_mod
 from main import (
+    _warm_supabase_pool,
     is_valid_email,
     check_email_in_use,
+    _check_account_exists_rpc,
+    forget_account_lookup,
+    send_confirmation_email,
+    queue_confirmation_email,
+    check_emails_in_use,
     is_valid_spotify_user_id,
     is_valid_auth_id,
     validate_request,
@@ -30,45 +43,163 @@ from main import (
     validate_queried_attributes,
     create_account,
     validate_create_request,
+    bulk_create_accounts,
     update_account,
     validate_update_request,
     delete_account,
     find_artist_by_name,
+    _artist_candidates,
+    ARTIST_CANDIDATE_LIMIT,
+    _json_response,
+    api_check_emails_in_use,
+    BULK_LOOKUP_LIMIT,
+    api_bulk_create_accounts,
+    BULK_CREATE_LIMIT,
+    api_account,
+    api_update_account,
+    app,
 )
 
 
-class TestEmailValidation(unittest.TestCase):
-    def test_valid_email(self):
-        self.assertTrue(is_valid_email("test@example.com"))
+@contextmanager
+def _patch_validate_get():
+    """Patches the helpers validate_get_request delegates to, yielding (extract, queried)."""
+    extract = patch.object(main_mod, "extract_and_prepare_attributes_for_get")
+    queried = patch.object(main_mod, "validate_queried_attributes")
+    with extract as mock_extract, queried as mock_validate_queried:
+        yield mock_extract, mock_validate_queried
+
+
+@contextmanager
+def _patch_validate_create():
+    """Patches the helpers validate_create_request delegates to, yielding (extract, required)."""
+    extract = patch.object(main_mod, "extract_and_prepare_attributes")
+    required = patch.object(main_mod, "check_required_attributes")
+    with extract as mock_extract, required as mock_check_required:
+        yield mock_extract, mock_check_required
+
+
+def _fake_supabase(result=None, exc=None):
+    """
+    Builds a hand-rolled stand-in for the table().update().eq().execute() chain used by
+        update_account and delete_account, recording each update payload in fake.updates.
+    """
+
+    def execute():
+        if exc is not None:
+            raise exc
+        return result
+
+    def update(values):
+        fake.updates.append(values)
+        return SimpleNamespace(
+            eq=lambda column, value: SimpleNamespace(execute=execute)
+        )
+
+    fake = SimpleNamespace(
+        updates=[], table=lambda name: SimpleNamespace(update=update)
+    )
+    return fake
+
+
+def _select_execute(mock_supabase):
+    """Returns the execute mock ending get_account_info's select chain, without calling the chain."""
+    query = mock_supabase.table.return_value.select.return_value.eq.return_value
+    return query.limit.return_value.execute
+
 
-    def test_missing_domain(self):
-        self.assertFalse(is_valid_email("test@"))
+def _insert_execute(mock_supabase):
+    """Returns the execute mock ending the insert chain, without calling the chain."""
+    return mock_supabase.table.return_value.insert.return_value.execute
 
-    def test_missing_at_symbol(self):
-        self.assertFalse(is_valid_email("testexample.com"))
 
-    def test_invalid_characters(self):
-        self.assertFalse(is_valid_email("test@exa$mple.com"))
+def _warm_up_limit(mock_supabase):
+    """Returns the limit mock in the pool warm-up query chain, without calling the chain."""
+    return mock_supabase.table.return_value.select.return_value.limit
 
-    def test_invalid_domain(self):
-        self.assertFalse(is_valid_email("test@example"))
 
-    def test_empty_string(self):
-        self.assertFalse(is_valid_email(""))
+class TestWarmSupabasePool(unittest.TestCase):
+    @patch.object(main_mod, "supabase")
+    def test_issues_zero_row_query(self, mock_supabase):
+        _warm_supabase_pool()
+        mock_supabase.table.assert_called_once_with("venues")
+        _warm_up_limit(mock_supabase).assert_called_once_with(0)
+
+    @patch.object(main_mod, "supabase")
+    def test_connection_error_ignored(self, mock_supabase):
+        execute = _warm_up_limit(mock_supabase).return_value.execute
+        execute.side_effect = Exception("Connection refused")
+        _warm_supabase_pool()
+
+
+class TestSendConfirmationEmail(unittest.TestCase):
+    @patch.dict(
+        "os.environ", {"BUSINESS_EMAIL": "team@example.com", "APP_PASSWORD": "pw"}
+    )
+    @patch.object(main_mod.yagmail, "SMTP")
+    def test_connection_closed_after_send(self, mock_smtp):
+        send_confirmation_email("testartist@example.com")
+
+        mock_smtp.assert_called_once_with(user="team@example.com", password="pw")
+        yag = mock_smtp.return_value.__enter__.return_value
+        yag.send.assert_called_once()
+        mock_smtp.return_value.__exit__.assert_called_once()
+
+
+class TestQueueConfirmationEmail(unittest.TestCase):
+    @patch.object(main_mod, "send_confirmation_email")
+    def test_send_runs_on_pool(self, mock_send):
+        future = queue_confirmation_email("testartist@example.com")
+        self.assertIsNone(future.result(timeout=5))
+        mock_send.assert_called_once_with("testartist@example.com")
+
+    @patch.object(main_mod, "send_confirmation_email")
+    def test_failed_send_logged(self, mock_send):
+        mock_send.side_effect = Exception("SMTP login failed")
+        with self.assertLogs(level="ERROR") as logs:
+            future = queue_confirmation_email("testartist@example.com")
+            self.assertIsInstance(future.exception(timeout=5), Exception)
+        self.assertIn("testartist@example.com", logs.output[0])
+
+
+class TestEmailValidation(unittest.TestCase):
+    # (input, expected) pairs, run as subtests of a single method
+    cases = [
+        ("test@example.com", True),
+        ("test@", False),  # Missing domain
+        ("testexample.com", False),  # Missing at symbol
+        ("test@exa$mple.com", False),  # Invalid characters
+        ("test@example", False),  # Invalid domain
+        ("", False),
+        ("test@@example.com", False),  # Multiple at symbols
+        ("test@example.com\n", False),  # Trailing newline
+        ("a" * 250 + "@example.com", False),  # Overlong email
+        ("a@b.cc", True),  # Shortest email
+        ("a@b.c", False),
+    ]
+
+    def test_emails(self):
+        for email, expected in self.cases:
+            with self.subTest(email=email):
+                self.assertEqual(is_valid_email(email), expected)
 
 
 class TestCheckEmailInUse(unittest.TestCase):
+    def setUp(self):
+        _check_account_exists_rpc.cache_clear()
 
-    @patch("main.supabase")
+    @patch.object(main_mod, "supabase")
     def test_email_in_use(self, mock_supabase):
         # Mock the response from Supabase
-        mock_supabase.rpc.return_value.execute.return_value.data = [
-            {
-                "account_type": "venue",
-                "message": "Email is already in use.",
-                "user_id": "123",
-            }
-        ]
+        mock_supabase.rpc.return_value.execute.return_value = SimpleNamespace(
+            data=[
+                {
+                    "account_type": "venue",
+                    "message": "Email is already in use.",
+                    "user_id": "123",
+                }
+            ]
+        )
 
         result = check_email_in_use("1234345256345636")
         self.assertEqual(
@@ -80,72 +211,249 @@ class TestCheckEmailInUse(unittest.TestCase):
             },
         )
 
-    @patch("main.supabase")
+    @patch.object(main_mod, "supabase")
     def test_email_not_in_use(self, mock_supabase):
-        mock_supabase.rpc.return_value.execute.return_value.data = []
+        mock_supabase.rpc.return_value.execute.return_value = SimpleNamespace(data=[])
         result = check_email_in_use("1234345256345636")
         self.assertEqual(result, {"message": "Account does not exist."})
 
-    @patch("main.supabase")
+    @patch.object(main_mod, "supabase")
     def test_invalid_email_format(self, mock_supabase):
         result = check_email_in_use("invalid-email")
         self.assertEqual(result, {"error": "Invalid Google Authentication ID format."})
+        mock_supabase.rpc.assert_not_called()
 
-    @patch("main.supabase")
+    @patch.object(main_mod, "supabase")
     def test_supabase_error(self, mock_supabase):
         mock_supabase.rpc.side_effect = Exception("Supabase query failed")
         result = check_email_in_use("1234345256345636")
         self.assertEqual(result, {"error": "An error occurred: Supabase query failed"})
 
+    @patch.object(main_mod, "supabase")
+    def test_repeated_lookup_is_cached(self, mock_supabase):
+        mock_supabase.rpc.return_value.execute.return_value = SimpleNamespace(data=[])
+        check_email_in_use("1234345256345636")
+        check_email_in_use("1234345256345636")
+        mock_supabase.rpc.assert_called_once()
+
+    @patch.object(main_mod, "supabase")
+    def test_forgotten_lookup_is_refetched(self, mock_supabase):
+        mock_supabase.rpc.return_value.execute.return_value = SimpleNamespace(data=[])
+        check_email_in_use("1234345256345636")
+        forget_account_lookup("1234345256345636")
+        check_email_in_use("1234345256345636")
+        self.assertEqual(mock_supabase.rpc.call_count, 2)
+
+
+class TestCheckEmailsInUse(unittest.TestCase):
+    def setUp(self):
+        _check_account_exists_rpc.cache_clear()
+
+    @patch.object(main_mod, "supabase")
+    def test_multiple_ids(self, mock_supabase):
+        mock_supabase.rpc.return_value.execute.return_value = SimpleNamespace(data=[])
+        result = check_emails_in_use(["1234345256345636", "invalid-id"])
+        self.assertEqual(
+            result,
+            {
+                "1234345256345636": {"message": "Account does not exist."},
+                "invalid-id": {"error": "Invalid Google Authentication ID format."},
+            },
+        )
+
+    @patch.object(main_mod, "supabase")
+    def test_duplicate_ids_looked_up_once(self, mock_supabase):
+        mock_supabase.rpc.return_value.execute.return_value = SimpleNamespace(data=[])
+        result = check_emails_in_use(["1234345256345636", "1234345256345636"])
+        self.assertEqual(len(result), 1)
+        mock_supabase.rpc.assert_called_once()
 
-class TestSpotifyIdValidation(unittest.TestCase):
-    def test_valid_url(self):
-        self.assertTrue(is_valid_spotify_user_id("4a0SGxC38bo29VPaHtiFBf"))
+    def test_empty_list(self):
+        self.assertEqual(check_emails_in_use([]), {})
 
-    def test_invalid_chars_in_url(self):
-        self.assertFalse(is_valid_spotify_user_id("4a0SGx@C38//bo29VPaHtiFBf"))
 
-    def test_too_short_url(self):
-        self.assertFalse(is_valid_spotify_user_id("4a0SG"))
+class TestApiCheckEmailsInUse(unittest.TestCase):
+    def test_ids_not_a_list_rejected(self):
+        request = MagicMock()
+        request.get_data.return_value = b'{"ids": "1234345256345636"}'
+        response, status = api_check_emails_in_use(request)
+        self.assertEqual(status, 400)
+        self.assertEqual(
+            response.get_json(), {"error": "Invalid or missing ids in JSON payload"}
+        )
 
-    def test_too_long_url(self):
-        self.assertFalse(
-            is_valid_spotify_user_id("4a0SGxCPaf438bo29Va38bHtiFBo2Hti0SGxCFBf9VPa")
+    def test_non_object_body_rejected(self):
+        for body in [["1234345256345636"], "1234345256345636", 1]:
+            with self.subTest(body=body):
+                with app.test_request_context(json=body):
+                    response, status = api_check_emails_in_use(flask_request)
+                self.assertEqual(status, 400)
+                self.assertEqual(
+                    response.get_json(),
+                    {"error": "Invalid or missing ids in JSON payload"},
+                )
+
+    @patch.object(main_mod, "check_emails_in_use")
+    def test_oversized_batch_rejected(self, mock_check):
+        body = {"ids": ["1234345256345636"] * (BULK_LOOKUP_LIMIT + 1)}
+        with app.test_request_context(json=body):
+            response, status = api_check_emails_in_use(flask_request)
+
+        self.assertEqual(status, 400)
+        self.assertEqual(
+            response.get_json(),
+            {"error": f"At most {BULK_LOOKUP_LIMIT} ids can be checked at once"},
         )
+        mock_check.assert_not_called()
 
+    @patch.object(main_mod, "check_emails_in_use")
+    def test_batch_at_limit_accepted(self, mock_check):
+        mock_check.return_value = {}
+        body = {"ids": ["1234345256345636"] * BULK_LOOKUP_LIMIT}
+        with app.test_request_context(json=body):
+            response, status = api_check_emails_in_use(flask_request)
 
-class TestGoogleIdValidation(unittest.TestCase):
-    def test_valid_id(self):
-        self.assertTrue(is_valid_auth_id("1465835860573088967"))
+        self.assertEqual(status, 200)
+        mock_check.assert_called_once_with(body["ids"])
 
-    def test_invalid_chars_in_id(self):
-        self.assertFalse(is_valid_auth_id("146583586@05733597/088967"))
 
-    def test_too_short_url(self):
-        self.assertFalse(is_valid_auth_id("1234"))
+class TestSpotifyIdValidation(unittest.TestCase):
+    cases = [
+        ("4a0SGxC38bo29VPaHtiFBf", True),
+        ("4a0SGx@C38//bo29VPaHtiFBf", False),  # Invalid characters
+        ("4a0SG", False),  # Too short
+        ("4a0SGxC38bo29VPaHtiFBf\n", False),  # Trailing newline
+        (12345678, False),  # Not a string
+        ("4a0SGxCPaf438bo29Va38bHtiFBo2Hti0SGxCFBf9VPa", False),  # Too long
+    ]
 
-    def test_too_long_url(self):
-        self.assertFalse(
-            is_valid_auth_id(
-                "14658358605733597088967146583586057335970889671465835860573359708896714658358605733597088967"
-            )
-        )
+    def test_spotify_ids(self):
+        for identifier, expected in self.cases:
+            with self.subTest(identifier=identifier):
+                self.assertEqual(is_valid_spotify_user_id(identifier), expected)
+
+
+class TestGoogleIdValidation(unittest.TestCase):
+    cases = [
+        ("1465835860573088967", True),
+        ("146583586@05733597/088967", False),  # Invalid characters
+        (1465835860573088967, False),  # Not a string
+        (None, False),
+        ("١٤٦٥٨٣٥٨٦٠٥٧٣٠٨٨٩٦٧", False),  # Non-ASCII digits
+        ("1234", False),  # Too short
+        (
+            "14658358605733597088967146583586057335970889671465835860573359708896714658358605733597088967",
+            False,
+        ),  # Too long
+    ]
+
+    def test_google_ids(self):
+        for identifier, expected in self.cases:
+            with self.subTest(identifier=identifier):
+                self.assertEqual(is_valid_auth_id(identifier), expected)
 
 
 class TestValidateRequest(unittest.TestCase):
+    invalid_object_type = (
+        False,
+        "Invalid object type. Must be one of ['venue', 'artist', 'attendee'].",
+    )
+    cases = [
+        (
+            {
+                "function": "get",
+                "object_type": "venue",
+                "identifier": "123456789101112",
+                "attributes": {"user_id": True, "city": True, "postcode": True},
+            },
+            (True, "Request is valid."),
+        ),
+        (
+            {
+                "function": "delete",
+                "object_type": "artist",
+                "identifier": "123456789101112",
+            },
+            (True, "Request is valid."),
+        ),
+        (
+            {
+                "function": "get",
+                "object_type": "artist",
+                "identifier": "invalid-email",
+                "attributes": {"user_id": True, "genre": True},
+            },
+            (False, "Invalid or missing unique ID."),
+        ),
+        (
+            {
+                "function": "get",
+                "object_type": "artist",
+                "identifier": "",
+                "attributes": {
+                    "user_id": True,
+                    "email": True,
+                    "username": False,
+                    "genre": False,
+                },
+            },
+            (False, "Invalid or missing unique ID."),
+        ),
+        (
+            {
+                "function": "get",
+                "object_type": "event",
+                "identifier": "example@example.com",
+                "attributes": {"user_id": True},
+            },
+            (False, "Management of events is handled by a separate API."),
+        ),
+        (
+            {
+                "function": "get",
+                "object_type": "ticket",
+                "identifier": "example@example.com",
+                "attributes": {"user_id": True},
+            },
+            (False, "Management of tickets is handled by a separate API."),
+        ),
+        (
+            {
+                "function": "get",
+                "object_type": "non-defined_account_type",
+                "identifier": "example@example.com",
+                "attributes": {"user_id": True, "genre": True},
+            },
+            invalid_object_type,
+        ),
+        # Missing object type
+        (
+            {
+                "function": "get",
+                "identifier": "example@example.com",
+                "attributes": {"user_id": True, "genre": True},
+            },
+            invalid_object_type,
+        ),
+        (
+            {
+                "function": "get",
+                "object_type": "artist",
+                "identifier": "123456789101112",
+                "attributes": {"user_id": False, "email": False, "genre": False},
+            },
+            (False, "At least one valid attribute must be queried with a true value."),
+        ),
+    ]
 
     def test_email_validation(self):
         self.assertTrue(is_valid_email("test@example.com"))
         self.assertFalse(is_valid_email("invalid-email"))
 
-    def test_valid_requests_with_attributes(self):
-        request = {
-            "function": "get",
-            "object_type": "venue",
-            "identifier": "123456789101112",
-            "attributes": {"user_id": True, "city": True, "postcode": True},
-        }
-        self.assertEqual(validate_request(request), (True, "Request is valid."))
+    def test_requests(self):
+        for request, expected in self.cases:
+            with self.subTest(request=request):
+                self.assertEqual(validate_request(request), expected)
 
     def test_request_with_nonexistant_attributes(self):
         request = {
@@ -158,141 +466,49 @@ class TestValidateRequest(unittest.TestCase):
         self.assertFalse(valid)
         self.assertIn("extra_field", message)
 
-    def test_invalid_id_in_request(self):
-        request = {
-            "function": "get",
-            "object_type": "artist",
-            "identifier": "invalid-email",
-            "attributes": {"user_id": True, "genre": True},
-        }
-        self.assertEqual(
-            validate_request(request), (False, "Invalid or missing unique ID.")
-        )
-
-    def test_missing_id(self):
-        request = {
-            "function": "get",
-            "object_type": "artist",
-            "identifier": "",
-            "attributes": {
-                "user_id": True,
-                "email": True,
-                "username": False,
-                "genre": False,
-            },
-        }
-        self.assertEqual(
-            validate_request(request), (False, "Invalid or missing unique ID.")
-        )
-
-    def test_event_object_type(self):
-        request = {
-            "function": "get",
-            "object_type": "event",
-            "identifier": "example@example.com",
-            "attributes": {
-                "user_id": True,
-            },
-        }
-        self.assertEqual(
-            validate_request(request),
-            (False, "Management of events is handled by a separate API."),
-        )
 
-    def test_ticket_object_type(self):
-        request = {
-            "function": "get",
-            "object_type": "ticket",
-            "identifier": "example@example.com",
-            "attributes": {
-                "user_id": True,
+class TestExtractAndPrepareAttributes(unittest.TestCase):
+    cases = [
+        (
+            {
+                "object_type": "artist",
+                "attributes": {"name": "John Doe", "genre": "Rock", "user_id": "12345"},
             },
-        }
-        self.assertEqual(
-            validate_request(request),
-            (False, "Management of tickets is handled by a separate API."),
-        )
-
-    def test_invalid_account_type(self):
-        request = {
-            "function": "get",
-            "object_type": "non-defined_account_type",
-            "identifier": "example@example.com",
-            "attributes": {"user_id": True, "genre": True},
-        }
-        self.assertEqual(
-            validate_request(request),
-            (
-                False,
-                "Invalid object type. Must be one of "
-                "['venue', 'artist', 'attendee'].",
-            ),
-        )
-
-    def test_missing_account_type(self):
-        request = {
-            "function": "get",
-            "identifier": "example@example.com",
-            "attributes": {"user_id": True, "genre": True},
-        }
-        self.assertEqual(
-            validate_request(request),
-            (
-                False,
-                "Invalid object type. Must be one of "
-                "['venue', 'artist', 'attendee'].",
-            ),
-        )
-
-    def test_request_with_all_false_attributes(self):
-        request = {
-            "function": "get",
-            "object_type": "artist",
-            "identifier": "123456789101112",
-            "attributes": {
-                "user_id": False,
-                "email": False,
-                "genre": False,
+            ("artist", {"name": "John Doe", "genre": "Rock", "user_id": "12345"}),
+        ),
+        ({"object_type": "attendee", "attributes": {}}, ("attendee", {})),
+        # No attributes key
+        ({"object_type": "event"}, ("event", {})),
+        # Missing object type
+        (
+            {"attributes": {"title": "Concert", "date": "2024-01-01"}},
+            (None, {"title": "Concert", "date": "2024-01-01"}),
+        ),
+        # Blank attribute name
+        (
+            {"object_type": "venue", "attributes": {"": "x", "city": "London"}},
+            ("venue", {"city": "London"}),
+        ),
+        # Additional request keys are ignored
+        (
+            {
+                "object_type": "ticket",
+                "attributes": {"seat": "A1", "user_id": "54321"},
+                "extra_key": "extra_value",
             },
-        }
-        self.assertEqual(
-            validate_request(request),
-            (False, "At least one valid attribute must be queried with a true value."),
-        )
-
+            ("ticket", {"seat": "A1", "user_id": "54321"}),
+        ),
+    ]
 
-class TestExtractAndPrepareAttributes(unittest.TestCase):
-    def test_with_full_request(self):
-        request = {
-            "object_type": "artist",
-            "attributes": {"name": "John Doe", "genre": "Rock", "user_id": "12345"},
-        }
-        expected = ("artist", {"name": "John Doe", "genre": "Rock", "user_id": "12345"})
-        self.assertEqual(extract_and_prepare_attributes(request), expected)
-
-    def test_with_empty_attributes(self):
-        request = {"object_type": "attendee", "attributes": {}}
-        expected = ("attendee", {})
-        self.assertEqual(extract_and_prepare_attributes(request), expected)
-
-    def test_with_no_attributes_key(self):
-        request = {"object_type": "event"}
-        expected = ("event", {})
-        self.assertEqual(extract_and_prepare_attributes(request), expected)
+    def test_requests(self):
+        for request, expected in self.cases:
+            with self.subTest(request=request):
+                self.assertEqual(extract_and_prepare_attributes(request), expected)
 
-    def test_with_missing_object_type(self):
-        request = {"attributes": {"title": "Concert", "date": "2024-01-01"}}
-        expected = (None, {"title": "Concert", "date": "2024-01-01"})
-        self.assertEqual(extract_and_prepare_attributes(request), expected)
-
-    def test_with_additional_keys(self):
-        request = {
-            "object_type": "ticket",
-            "attributes": {"seat": "A1", "user_id": "54321"},
-            "extra_key": "extra_value",
-        }
-        expected = ("ticket", {"seat": "A1", "user_id": "54321"})
-        self.assertEqual(extract_and_prepare_attributes(request), expected)
+    def test_attributes_returned_without_copy(self):
+        attributes = {"city": "London"}
+        request = {"object_type": "venue", "attributes": attributes}
+        self.assertIs(extract_and_prepare_attributes(request)[1], attributes)
 
 
 class TestCheckForExtraAttributes(unittest.TestCase):
@@ -335,54 +551,50 @@ class TestCheckForExtraAttributes(unittest.TestCase):
             "status",
         ],
     }
+    allowed_attributes = {k: frozenset(v) for k, v in attributes_schema.items()}
 
-    @patch("main.attributes_schema", attributes_schema)
-    def test_with_extra_attributes(self):
-        validation_attributes = {
-            "name": "John Doe",
-            "genre": "Rock",
-            "extra": "Not Allowed",
-        }
-        object_type = "artist"
-        self.assertFalse(
-            check_for_extra_attributes(validation_attributes, object_type)[0]
-        )
-
-    @patch("main.attributes_schema", attributes_schema)
-    def test_with_all_required_attributes(self):
-        validation_attributes = {
-            "user_id": "1234456789101112",
-            "venue_name": "The Julius Bar",
-            "email": "testvenue@example.com",
-            "street_address": "1 Road Street",
-            "postcode": "AB1 2CD",
-            "city": "London",
-        }
-
-        object_type = "venue"
-        success, message = check_for_extra_attributes(
-            validation_attributes, object_type
-        )
-
-        # self.assertTrue(success)
-        self.assertEqual(message, "")
-
-    @patch("main.attributes_schema", attributes_schema)
-    def test_object_type_not_in_schema(self):
-        validation_attributes = {"field": "value"}
-        object_type = "nonexistent"
-        self.assertFalse(
-            check_for_extra_attributes(validation_attributes, object_type)[0],
-            "Should return False as there are no defined attributes in the schema.",
-        )
-
-    @patch("main.attributes_schema", attributes_schema)
-    def test_empty_validation_attributes(self):
-        validation_attributes = {}
-        object_type = "artist"
-        self.assertTrue(
-            check_for_extra_attributes(validation_attributes, object_type)[0],
-            "Should return True as empty attributes cannot include extra ones.",
+    cases = [
+        (
+            {"name": "John Doe", "genre": "Rock", "extra": "Not Allowed"},
+            "artist",
+            False,
+        ),
+        (
+            {
+                "user_id": "1234456789101112",
+                "venue_name": "The Julius Bar",
+                "email": "testvenue@example.com",
+                "street_address": "1 Road Street",
+                "postcode": "AB1 2CD",
+                "city": "London",
+            },
+            "venue",
+            True,
+        ),
+        # No attributes are defined for an unknown object type
+        ({"field": "value"}, "nonexistent", False),
+        # Empty attributes cannot include extra ones
+        ({}, "artist", True),
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        # Patch the schema once for the whole class rather than around every test
+        patcher = patch.object(main_mod, "_ALLOWED_ATTRIBUTES", cls.allowed_attributes)
+        patcher.start()
+        cls.addClassCleanup(patcher.stop)
+
+    def test_extra_attributes(self):
+        for attributes, object_type, expected in self.cases:
+            with self.subTest(attributes=attributes, object_type=object_type):
+                self.assertEqual(
+                    check_for_extra_attributes(attributes, object_type)[0], expected
+                )
+
+    def test_undefined_attributes_message(self):
+        self.assertEqual(
+            check_for_extra_attributes({"city": "London", "capacity": 50}, "venue"),
+            (False, "Additional, undefined attributes cannot be specified: capacity."),
         )
 
 
@@ -392,57 +604,48 @@ class TestCheckRequiredAttributes(unittest.TestCase):
         "artist": {"name", "genre", "country"},
         "venue": {"location", "capacity"},
     }
-
-    @patch("main.attributes_schema", attributes_schema)
-    def test_all_required_attributes_provided(self):
-        validation_attributes = {"name": "John Doe", "genre": "Rock", "country": "USA"}
-        object_type = "artist"
-        self.assertTrue(
-            check_required_attributes(validation_attributes, object_type)[0]
-        )
-
-    @patch("main.attributes_schema", attributes_schema)
-    def test_missing_required_attributes(self):
-        validation_attributes = {
-            "name": "John Doe",
-            "genre": "Rock",
-        }  # Missing 'country'
-        object_type = "artist"
-        self.assertFalse(
-            check_required_attributes(validation_attributes, object_type)[0]
-        )
-
-    @patch("main.attributes_schema", attributes_schema)
-    def test_object_type_not_in_schema(self):
-        validation_attributes = {"field": "value"}
-        object_type = "nonexistent"
-        self.assertFalse(
-            check_required_attributes(validation_attributes, object_type)[0],
-            "Should return False as there are no defined required attributes to request.",
-        )
-
-    @patch("main.attributes_schema", attributes_schema)
-    def test_empty_validation_attributes(self):
-        validation_attributes = {}
-        object_type = "artist"
-        # Since 'artist' has required attributes and none are provided, expecting False
-        self.assertFalse(
-            check_required_attributes(validation_attributes, object_type)[0],
-            "Should return False as required attributes are missing.",
+    allowed_attributes = {k: frozenset(v) for k, v in attributes_schema.items()}
+
+    cases = [
+        ({"name": "John Doe", "genre": "Rock", "country": "USA"}, "artist", True),
+        ({"name": "John Doe", "genre": "Rock"}, "artist", False),
+        # No required attributes are defined for an unknown object type
+        ({"field": "value"}, "nonexistent", False),
+        ({}, "artist", False),
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        # Patch the schema once for the whole class rather than around every test
+        for attribute in ["_ALLOWED_ATTRIBUTES", "_REQUIRED_ATTRIBUTES"]:
+            patcher = patch.object(main_mod, attribute, cls.allowed_attributes)
+            patcher.start()
+            cls.addClassCleanup(patcher.stop)
+
+    def test_required_attributes(self):
+        for attributes, object_type, expected in self.cases:
+            with self.subTest(attributes=attributes, object_type=object_type):
+                self.assertEqual(
+                    check_required_attributes(attributes, object_type)[0], expected
+                )
+
+    def test_missing_attributes_listed_in_order(self):
+        validation_attributes = {"name": "John Doe"}
+        self.assertEqual(
+            check_required_attributes(validation_attributes, "artist"),
+            (False, "Missing required attributes: country, genre."),
         )
 
 
 class TestGetAccountInfo(unittest.TestCase):
-
-    @patch("main.supabase")
-    @patch("main.validate_request")
-    def test_valid_request_with_account_found(self, mock_validate, mock_supabase):
+    @patch.multiple(main_mod, supabase=DEFAULT, validate_request=DEFAULT)
+    def test_valid_request_with_account_found(self, supabase, validate_request):
         # Mock validate_request to return valid
-        mock_validate.return_value = (True, "Request is valid.")
+        validate_request.return_value = (True, "Request is valid.")
         # Mock Supabase response
-        mock_supabase.table().select().eq().execute.return_value.data = [
-            {"user_id": "123"}
-        ]
+        _select_execute(supabase).return_value = SimpleNamespace(
+            data=[{"user_id": "123"}]
+        )
 
         request = {
             "function": "get",
@@ -453,12 +656,30 @@ class TestGetAccountInfo(unittest.TestCase):
         result = get_account_info(request)
         self.assertTrue(result["in_use"])
         self.assertIn("Email is registered with user", result["message"])
+        self.assertEqual(result["data"], {"user_id": "123"})
+        supabase.table.return_value.select.assert_called_with("user_id,username")
+
+    @patch.multiple(main_mod, supabase=DEFAULT, validate_request=DEFAULT)
+    def test_attribute_list_request(self, supabase, validate_request):
+        validate_request.return_value = (True, "Request is valid.")
+        _select_execute(supabase).return_value = SimpleNamespace(
+            data=[{"user_id": "123"}]
+        )
+
+        request = {
+            "function": "get",
+            "object_type": "venue",
+            "identifier": "1234456789101112",
+            "attributes": ["user_id", "email"],
+        }
+        result = get_account_info(request)
+        self.assertTrue(result["in_use"])
+        supabase.table.return_value.select.assert_called_with("user_id,email")
 
-    @patch("main.supabase")
-    @patch("main.validate_request")
-    def test_valid_request_no_account_found(self, mock_validate, mock_supabase):
-        mock_validate.return_value = (True, "Request is valid.")
-        mock_supabase.table().select().eq().execute.return_value.data = []
+    @patch.multiple(main_mod, supabase=DEFAULT, validate_request=DEFAULT)
+    def test_valid_request_no_account_found(self, supabase, validate_request):
+        validate_request.return_value = (True, "Request is valid.")
+        _select_execute(supabase).return_value = SimpleNamespace(data=[])
 
         request = {
             "function": "get",
@@ -470,7 +691,7 @@ class TestGetAccountInfo(unittest.TestCase):
         self.assertFalse(result["in_use"])
         self.assertEqual(result["message"], "Email is not in use.")
 
-    @patch("main.validate_request")
+    @patch.object(main_mod, "validate_request")
     def test_invalid_function(self, mock_validate):
         mock_validate.return_value = (False, "Invalid function specified.")
 
@@ -482,11 +703,10 @@ class TestGetAccountInfo(unittest.TestCase):
         result = get_account_info(request)
         self.assertEqual(result, {"error": "Invalid function specified."})
 
-    @patch("main.supabase")
-    @patch("main.validate_request")
-    def test_api_error(self, mock_validate, mock_supabase):
-        mock_validate.return_value = (True, "Request is valid.")
-        mock_supabase.table().select().eq().execute.side_effect = Exception("API error")
+    @patch.multiple(main_mod, supabase=DEFAULT, validate_request=DEFAULT)
+    def test_api_error(self, supabase, validate_request):
+        validate_request.return_value = (True, "Request is valid.")
+        _select_execute(supabase).side_effect = Exception("API error")
 
         request = {
             "function": "get",
@@ -498,22 +718,36 @@ class TestGetAccountInfo(unittest.TestCase):
         self.assertTrue("error" in result)
         self.assertEqual(result["error"], "An API error occurred: API error")
 
+    @patch.multiple(main_mod, supabase=DEFAULT, validate_request=DEFAULT)
+    def test_postgrest_error_details_kept(self, supabase, validate_request):
+        validate_request.return_value = (True, "Request is valid.")
+        _select_execute(supabase).side_effect = APIError(
+            {"code": "42703", "message": "column venues.username does not exist"}
+        )
+
+        result = get_account_info(
+            {
+                "function": "get",
+                "object_type": "venue",
+                "identifier": "1234456789101112",
+                "attributes": ["username"],
+            }
+        )
+        self.assertIn("column venues.username does not exist", result["error"])
 
-class TestValidateGetRequest(unittest.TestCase):
-    @patch("main.extract_and_prepare_attributes_for_get")
-    @patch("main.validate_queried_attributes")
-    def test_successful_validation(self, mock_validate_queried, mock_extract):
-        # Setup mock responses
-        mock_extract.return_value = ("artist", {"name": True, "genre": True})
-        mock_validate_queried.return_value = (True, "")
 
+class TestValidateGetRequest(unittest.TestCase):
+    def test_successful_validation(self):
         request = {"object_type": "artist", "attributes": ["name", "genre"]}
-        valid, message = validate_get_request(request)
+        with _patch_validate_get() as (mock_extract, mock_validate_queried):
+            mock_extract.return_value = ("artist", {"name": True, "genre": True})
+            mock_validate_queried.return_value = (True, "")
+            valid, message = validate_get_request(request)
 
         self.assertTrue(valid)
         self.assertEqual(message, "Request is valid.")
 
-    @patch("main.extract_and_prepare_attributes_for_get")
+    @patch.object(main_mod, "extract_and_prepare_attributes_for_get")
     def test_no_attributes_provided(self, mock_extract):
         # Setup mock response to simulate no attributes provided
         mock_extract.return_value = ("artist", {})
@@ -524,50 +758,43 @@ class TestValidateGetRequest(unittest.TestCase):
         self.assertFalse(valid)
         self.assertEqual(message, "Attributes must be provided for querying.")
 
-    @patch("main.extract_and_prepare_attributes_for_get")
-    @patch("main.validate_queried_attributes")
-    def test_queried_attributes_validation_fails(
-        self, mock_validate_queried, mock_extract
-    ):
-        # Setup mock responses to simulate queried attributes validation failure
-        mock_extract.return_value = ("artist", {"name": True})
-        mock_validate_queried.return_value = (False, "Invalid attribute")
-
+    def test_queried_attributes_validation_fails(self):
         request = {"object_type": "artist", "attributes": ["name"]}
-        valid, message = validate_get_request(request)
+        with _patch_validate_get() as (mock_extract, mock_validate_queried):
+            # Simulate queried attributes validation failure
+            mock_extract.return_value = ("artist", {"name": True})
+            mock_validate_queried.return_value = (False, "Invalid attribute")
+            valid, message = validate_get_request(request)
 
         self.assertFalse(valid)
         self.assertEqual(message, "Invalid attribute")
 
 
 class TestExtractAndPrepareAttributesForGet(unittest.TestCase):
-    def test_attributes_as_list(self):
-        request = {"object_type": "artist", "attributes": ["name", "genre"]}
-        expected = ("artist", {"name": True, "genre": True})
-        self.assertEqual(extract_and_prepare_attributes_for_get(request), expected)
-
-    def test_attributes_as_dict(self):
-        request = {
-            "object_type": "venue",
-            "attributes": {"location": True, "capacity": False},
-        }
-        expected = ("venue", {"location": True, "capacity": False})
-        self.assertEqual(extract_and_prepare_attributes_for_get(request), expected)
-
-    def test_attributes_not_provided(self):
-        request = {"object_type": "event"}
-        expected = ("event", {})
-        self.assertEqual(extract_and_prepare_attributes_for_get(request), expected)
-
-    def test_empty_attributes_list(self):
-        request = {"object_type": "ticket", "attributes": []}
-        expected = ("ticket", {})
-        self.assertEqual(extract_and_prepare_attributes_for_get(request), expected)
-
-    def test_empty_attributes_dict(self):
-        request = {"object_type": "attendee", "attributes": {}}
-        expected = ("attendee", {})
-        self.assertEqual(extract_and_prepare_attributes_for_get(request), expected)
+    cases = [
+        (
+            {"object_type": "artist", "attributes": ["name", "genre"]},
+            ("artist", {"name": True, "genre": True}),
+        ),
+        (
+            {
+                "object_type": "venue",
+                "attributes": {"location": True, "capacity": False},
+            },
+            ("venue", {"location": True, "capacity": False}),
+        ),
+        # Attributes not provided
+        ({"object_type": "event"}, ("event", {})),
+        ({"object_type": "ticket", "attributes": []}, ("ticket", {})),
+        ({"object_type": "attendee", "attributes": {}}, ("attendee", {})),
+    ]
+
+    def test_requests(self):
+        for request, expected in self.cases:
+            with self.subTest(request=request):
+                self.assertEqual(
+                    extract_and_prepare_attributes_for_get(request), expected
+                )
 
 
 class TestValidateQueriedAttributes(unittest.TestCase):
@@ -576,57 +803,43 @@ class TestValidateQueriedAttributes(unittest.TestCase):
         "artist": ["name", "genre", "country"],
         "venue": ["location", "capacity"],
     }
-    account_types = ["venue", "artist", "attendee"]
-    non_account_types = ["event", "ticket"]
-
-    @patch("main.attributes_schema", attributes_schema)
-    @patch("main.account_types", account_types)
-    @patch("main.non_account_types", non_account_types)
-    def test_valid_queried_attributes(self):
-        queried_attributes = {"name": True, "genre": True}
-        object_type = "artist"
-        self.assertTrue(validate_queried_attributes(queried_attributes, object_type)[0])
-
-    def test_invalid_attribute_in_queried_attributes(self):
-        queried_attributes = {"name": True, "invalid_attr": True}
-        object_type = "artist"
-        self.assertFalse(
-            validate_queried_attributes(queried_attributes, object_type)[0]
-        )
-
-    def test_non_account_type_object(self):
-        queried_attributes = {"name": True}
-        object_type = "event"
-        self.assertFalse(
-            validate_queried_attributes(queried_attributes, object_type)[0]
-        )
-
-    def test_invalid_object_type(self):
-        queried_attributes = {"name": True}
-        object_type = "nonexistent_type"
-        self.assertFalse(
-            validate_queried_attributes(queried_attributes, object_type)[0]
-        )
-
-    def test_empty_queried_attributes(self):
-        queried_attributes = {}
-        object_type = "artist"
-        self.assertFalse(
-            validate_queried_attributes(queried_attributes, object_type)[0]
-        )
-
-    def test_queried_attribute_with_false_value(self):
-        queried_attributes = {"name": False, "genre": True}
-        object_type = "artist"
-        self.assertFalse(
-            validate_queried_attributes(queried_attributes, object_type)[0]
-        )
+    allowed_attributes = {k: frozenset(v) for k, v in attributes_schema.items()}
+    account_types = frozenset({"venue", "artist", "attendee"})
+    non_account_types = frozenset({"event", "ticket"})
+
+    cases = [
+        ({"name": True, "genre": True}, "artist", True),
+        ({"name": True, "invalid_attr": True}, "artist", False),
+        ({"name": True}, "event", False),
+        ({"name": True}, "nonexistent_type", False),
+        ({}, "artist", False),
+        ({"name": False, "genre": True}, "artist", False),
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        # Patch the schema once for the whole class rather than around every test
+        for attribute, value in [
+            ("_ALLOWED_ATTRIBUTES", cls.allowed_attributes),
+            ("_ACCOUNT_TYPES", cls.account_types),
+            ("_NON_ACCOUNT_TYPES", cls.non_account_types),
+        ]:
+            patcher = patch.object(main_mod, attribute, value)
+            patcher.start()
+            cls.addClassCleanup(patcher.stop)
+
+    def test_queried_attributes(self):
+        for attributes, object_type, expected in self.cases:
+            with self.subTest(attributes=attributes, object_type=object_type):
+                self.assertEqual(
+                    validate_queried_attributes(attributes, object_type)[0], expected
+                )
 
 
 class TestCreateAccount(unittest.TestCase):
-    # @patch("main.send_confirmation_email")
-    # @patch("main.validate_request")
-    # @patch("main.supabase")
+    # @patch.object(main_mod, "send_confirmation_email")
+    # @patch.object(main_mod, "validate_request")
+    # @patch.object(main_mod, "supabase")
     # def test_valid_request(self, mock_supabase, mock_validate, mock_send_email):
     #     def mock_send_confirmation_email(recipient_email):
     # Simulate successful email sending (no actual email is sent)
@@ -667,7 +880,37 @@ class TestCreateAccount(unittest.TestCase):
     # Assert that send_confirmation_email was called with the correct email
     #    mock_send_confirmation_email.assert_called_once_with("testartist@example.com")
 
-    @patch("main.validate_request")
+    @patch.object(main_mod, "queue_confirmation_email")
+    @patch.multiple(main_mod, supabase=DEFAULT, validate_request=DEFAULT)
+    def test_confirmation_email_finished_before_return(
+        self, mock_queue, supabase, validate_request
+    ):
+        validate_request.return_value = (True, "")
+        _insert_execute(supabase).return_value = (
+            ("data", [{"user_id": "12345"}]),
+            ("count", None),
+        )
+        sent = Future()
+        mock_queue.return_value = sent
+        # Complete the send only when create_account waits on it
+        with patch.object(
+            main_mod, "wait", side_effect=lambda fs: sent.set_result(None)
+        ):
+            user_id, message = create_account(
+                {
+                    "function": "create",
+                    "object_type": "artist",
+                    "identifier": "123456789101112",
+                    "attributes": {"email": "testartist@example.com"},
+                }
+            )
+
+        self.assertEqual(user_id, "12345")
+        self.assertEqual(message, "Account creation was successful.")
+        mock_queue.assert_called_once_with("testartist@example.com")
+        self.assertTrue(sent.done())
+
+    @patch.object(main_mod, "validate_request")
     def test_invalid_request(self, mock_validate):
         mock_validate.return_value = (
             False,
@@ -693,13 +936,10 @@ class TestCreateAccount(unittest.TestCase):
             "Invalid object type. Must be one of ['venue', 'artist', 'attendee'].",
         )
 
-    @patch("main.validate_request")
-    @patch("main.supabase")
-    def test_exception_during_insert(self, mock_supabase, mock_validate):
-        mock_validate.return_value = (True, "")
-        mock_supabase.table().insert().execute.side_effect = Exception(
-            "Database connection error"
-        )
+    @patch.multiple(main_mod, supabase=DEFAULT, validate_request=DEFAULT)
+    def test_exception_during_insert(self, supabase, validate_request):
+        validate_request.return_value = (True, "")
+        _insert_execute(supabase).side_effect = Exception("Database connection error")
 
         user_id, message = create_account(
             {
@@ -722,45 +962,35 @@ class TestCreateAccount(unittest.TestCase):
 
 
 class TestValidateCreateRequest(unittest.TestCase):
-    @patch("main.extract_and_prepare_attributes")
-    @patch("main.check_required_attributes")
-    @patch("main.check_for_extra_attributes")
-    def test_successful_validation(
-        self, mock_check_extra, mock_check_required, mock_extract
-    ):
-        # Setup mock responses for a successful validation path
-        mock_extract.return_value = ("artist", {"name": "John", "genre": "Rock"})
-        mock_check_required.return_value = (True, "")
-        mock_check_extra.return_value = (True, "")
-
+    def test_successful_validation(self):
         request = {
             "object_type": "artist",
             "attributes": {"name": "John", "genre": "Rock"},
         }
-        valid, message = validate_create_request(request)
+        with _patch_validate_create() as (mock_extract, mock_check_required):
+            mock_extract.return_value = ("artist", {"name": "John", "genre": "Rock"})
+            mock_check_required.return_value = (True, "")
+            valid, message = validate_create_request(request)
 
         self.assertTrue(valid)
         self.assertEqual(message, "Request is valid.")
 
-    @patch("main.extract_and_prepare_attributes")
-    @patch("main.check_required_attributes")
-    def test_missing_required_attributes(self, mock_check_required, mock_extract):
-        # Simulate missing required attributes
-        mock_extract.return_value = (
-            "artist",
-            {"genres": "Rock", "bio": "intersting bio"},
-        )
-        mock_check_required.return_value = (False, "Missing required attributes.")
-
+    def test_missing_required_attributes(self):
         request = {"object_type": "artist", "attributes": {"genres": "Rock"}}
-        valid, message = validate_create_request(request)
+        with _patch_validate_create() as (mock_extract, mock_check_required):
+            # Simulate missing required attributes
+            mock_extract.return_value = (
+                "artist",
+                {"genres": "Rock", "bio": "intersting bio"},
+            )
+            mock_check_required.return_value = (False, "Missing required attributes.")
+            valid, message = validate_create_request(request)
 
         self.assertFalse(valid)
         self.assertEqual(message, "Missing required attributes.")
 
-    @patch("main.extract_and_prepare_attributes")
-    @patch("main.check_for_extra_attributes")
-    def test_extra_undefined_attributes(self, mock_check_extra, mock_extract):
+    @patch.object(main_mod, "extract_and_prepare_attributes")
+    def test_extra_undefined_attributes(self, mock_extract):
         mock_extract.return_value = (
             "artist",
             {
@@ -771,11 +1001,6 @@ class TestValidateCreateRequest(unittest.TestCase):
                 "extra_attr": "Not Allowed",
             },
         )
-        mock_check_extra.return_value = (
-            False,
-            "Additional, undefined attributes cannot be specified: extra_attr.",
-        )
-
         request = {
             "object_type": "artist",
             "attributes": {"name": "John", "extra_attr": "Not Allowed"},
@@ -787,7 +1012,7 @@ class TestValidateCreateRequest(unittest.TestCase):
             message, "Additional, undefined attributes cannot be specified: extra_attr."
         )
 
-    @patch("main.extract_and_prepare_attributes")
+    @patch.object(main_mod, "extract_and_prepare_attributes")
     def test_attributes_without_value(self, mock_extract):
         mock_extract.return_value = (
             "artist",
@@ -823,30 +1048,195 @@ class TestValidateCreateRequest(unittest.TestCase):
         )
 
 
-class TestUpdateAccount(unittest.TestCase):
-    @patch("main.validate_request")
-    @patch("main.supabase")
-    def test_valid_update_request(self, mock_supabase, mock_validate):
+class TestBulkCreateAccounts(unittest.TestCase):
+    @staticmethod
+    def _sent_email():
+        # A completed send, so bulk_create_accounts can wait on the queued emails
+        future = Future()
+        future.set_result(None)
+        return future
+
+    venue_request = {
+        "function": "create",
+        "object_type": "venue",
+        "identifier": "1234456789101112",
+        "attributes": {"email": "testvenue@example.com"},
+    }
+    artist_request = {
+        "function": "create",
+        "object_type": "artist",
+        "identifier": "1234456789101113",
+        "attributes": {"email": "testartist@example.com"},
+    }
+
+    @patch.object(main_mod, "queue_confirmation_email")
+    @patch.object(main_mod, "validate_request")
+    @patch.object(main_mod, "supabase")
+    def test_one_insert_per_object_type(self, mock_supabase, mock_validate, mock_send):
         mock_validate.return_value = (True, "")
-        mock_result = MagicMock()
-        mock_result.error = None
-        mock_result.data = [{"email": "new_email@example.com"}]
-        mock_supabase.table().update().eq().execute.return_value = mock_result
+        mock_send.return_value = self._sent_email()
+        _insert_execute(mock_supabase).side_effect = [
+            SimpleNamespace(data=[{"user_id": "1"}, {"user_id": "2"}]),
+            SimpleNamespace(data=[{"user_id": "3"}]),
+        ]
 
-        request = {
-            "function": "update",
-            "object_type": "artist",
-            "identifier": "artist_id_123",
-            "attributes": {"email": "new_email@example.com"},
+        results = bulk_create_accounts(
+            [self.venue_request, self.artist_request, self.venue_request]
+        )
+
+        self.assertEqual(
+            results,
+            [
+                ("1", "Account creation was successful."),
+                ("3", "Account creation was successful."),
+                ("2", "Account creation was successful."),
+            ],
+        )
+        self.assertEqual(_insert_execute(mock_supabase).call_count, 2)
+        self.assertEqual(mock_send.call_count, 3)
+
+    @patch.object(main_mod, "queue_confirmation_email")
+    @patch.object(main_mod, "validate_request")
+    @patch.object(main_mod, "supabase")
+    def test_rows_with_different_keys_inserted_separately(
+        self, mock_supabase, mock_validate, mock_send
+    ):
+        mock_validate.return_value = (True, "")
+        mock_send.return_value = self._sent_email()
+        venue_with_bio = {
+            "function": "create",
+            "object_type": "venue",
+            "identifier": "1234456789101114",
+            "attributes": {"email": "biovenue@example.com", "bio": "Live music"},
         }
-        success, message = update_account(request)
+        _insert_execute(mock_supabase).side_effect = [
+            SimpleNamespace(data=[{"user_id": "1"}]),
+            SimpleNamespace(data=[{"user_id": "2"}]),
+        ]
+
+        results = bulk_create_accounts([self.venue_request, venue_with_bio])
+
+        # PostgREST requires every object in an array insert to have the same keys
+        insert = mock_supabase.table.return_value.insert
+        self.assertEqual(
+            [call.args[0] for call in insert.call_args_list],
+            [
+                [{"email": "testvenue@example.com"}],
+                [{"email": "biovenue@example.com", "bio": "Live music"}],
+            ],
+        )
+        self.assertEqual(
+            results,
+            [
+                ("1", "Account creation was successful."),
+                ("2", "Account creation was successful."),
+            ],
+        )
+
+    @patch.object(main_mod, "queue_confirmation_email")
+    @patch.object(main_mod, "validate_request")
+    @patch.object(main_mod, "supabase")
+    def test_created_ids_forgotten(self, mock_supabase, mock_validate, mock_send):
+        mock_validate.return_value = (True, "")
+        mock_send.return_value = self._sent_email()
+        _insert_execute(mock_supabase).return_value = SimpleNamespace(
+            data=[{"user_id": "1"}]
+        )
+
+        with patch.object(main_mod, "forget_account_lookup") as mock_forget:
+            bulk_create_accounts([self.venue_request])
+
+        mock_forget.assert_called_once_with("1234456789101112")
+
+    @patch.object(main_mod, "validate_request")
+    @patch.object(main_mod, "supabase")
+    def test_invalid_requests_not_inserted(self, mock_supabase, mock_validate):
+        mock_validate.return_value = (False, "Invalid or missing unique ID.")
+
+        results = bulk_create_accounts([self.venue_request])
+
+        self.assertEqual(results, [(None, "Invalid or missing unique ID.")])
+        _insert_execute(mock_supabase).assert_not_called()
+
+    @patch.object(main_mod, "validate_request")
+    @patch.object(main_mod, "supabase")
+    def test_exception_fails_whole_group(self, mock_supabase, mock_validate):
+        mock_validate.return_value = (True, "")
+        _insert_execute(mock_supabase).side_effect = Exception(
+            "Database connection error"
+        )
+
+        results = bulk_create_accounts([self.venue_request, self.venue_request])
+
+        self.assertEqual(
+            results,
+            [(None, "An exception occurred: Database connection error")] * 2,
+        )
+
+
+class TestUpdateAccount(unittest.TestCase):
+    email_request = {
+        "function": "update",
+        "object_type": "artist",
+        "identifier": "artist_id_123",
+        "attributes": {"email": "new_email@example.com"},
+    }
+    email_and_none_request = {
+        "function": "update",
+        "object_type": "artist",
+        "identifier": "artist_id_123",
+        "attributes": {"email": "new_email@example.com", "bio": None},
+    }
+    none_only_request = {
+        "object_type": "artist",
+        "identifier": "artist_id_123",
+        "attributes": {"email": None},
+    }
+    username_request = {
+        "object_type": "artist",
+        "identifier": "artist_id_123",
+        "attributes": {"username": "new_username"},
+    }
+    genre_request = {
+        "object_type": "artist",
+        "identifier": "artist_id_123",
+        "attributes": {"genre": "new_genre"},
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        # Patch validation once for the whole class; each test sets the result it needs
+        patcher = patch.object(main_mod, "validate_request")
+        cls.mock_validate = patcher.start()
+        cls.addClassCleanup(patcher.stop)
+
+    def setUp(self):
+        self.mock_validate.reset_mock()
+        self.mock_validate.return_value = (True, "")
+
+    def test_valid_update_request(self):
+        mock_result = SimpleNamespace(
+            data=[{"email": "new_email@example.com"}], error=None
+        )
+        with patch.object(main_mod, "supabase", _fake_supabase(mock_result)):
+            success, message = update_account(self.email_request)
 
         self.assertTrue(success)
         self.assertEqual(message, "Account update was successful.")
 
-    @patch("main.validate_request")
-    def test_invalid_request_structure(self, mock_validate):
-        mock_validate.return_value = (False, "Invalid request structure")
+    def test_none_values_dropped_from_update(self):
+        fake = _fake_supabase(
+            SimpleNamespace(data=[{"email": "new_email@example.com"}])
+        )
+        with patch.object(main_mod, "supabase", fake):
+            update_account(self.email_and_none_request)
+
+        self.assertEqual(fake.updates, [{"email": "new_email@example.com"}])
+        # The shared request is left as it was for the other tests
+        self.assertIn("bio", self.email_and_none_request["attributes"])
+
+    def test_invalid_request_structure(self):
+        self.mock_validate.return_value = (False, "Invalid request structure")
 
         request = {}  # Simulating an invalid request
         success, message = update_account(request)
@@ -854,68 +1244,57 @@ class TestUpdateAccount(unittest.TestCase):
         self.assertFalse(success)
         self.assertEqual(message, "Invalid request structure")
 
-    @patch("main.validate_request")
-    def test_no_valid_attributes_for_update(self, mock_validate):
-        mock_validate.return_value = (True, "")
-
-        request = {
-            "object_type": "artist",
-            "identifier": "artist_id_123",
-            "attributes": {"email": None},  # No valid attributes to update
-        }
-        success, message = update_account(request)
+    def test_no_valid_attributes_for_update(self):
+        success, message = update_account(self.none_only_request)
 
         self.assertFalse(success)
         self.assertEqual(message, "No valid attributes provided for update.")
 
-    @patch("main.validate_request")
-    @patch("main.supabase")
-    def test_supabase_update_error(self, mock_supabase, mock_validate):
-        mock_validate.return_value = (True, "")
-        mock_result = MagicMock()
-        mock_result.error = (
-            "Failed to update account: Attributes not updated as expected."
+    def test_supabase_update_error(self):
+        # The row comes back without the requested value applied
+        mock_result = SimpleNamespace(
+            data=[{"username": "old_username"}],
+            error="Failed to update account: Attributes not updated as expected.",
         )
-        mock_supabase.table().update().eq().execute.return_value = mock_result
-
-        request = {
-            "object_type": "artist",
-            "identifier": "artist_id_123",
-            "attributes": {"username": "new_username"},
-        }
-        success, message = update_account(request)
+        with patch.object(main_mod, "supabase", _fake_supabase(mock_result)):
+            success, message = update_account(self.username_request)
 
         self.assertFalse(success)
         self.assertIn(
             "Failed to update account: Attributes not updated as expected.", message
         )
 
-    @patch("main.validate_request")
-    @patch("main.supabase")
-    def test_exception_during_update_operation(self, mock_supabase, mock_validate):
-        mock_validate.return_value = (True, "")
-        mock_supabase.table().update().eq().execute.side_effect = Exception(
-            "Database error"
-        )
-
-        request = {
-            "object_type": "artist",
-            "identifier": "artist_id_123",
-            "attributes": {"genre": "new_genre"},
-        }
-        success, message = update_account(request)
+    def test_exception_during_update_operation(self):
+        fake = _fake_supabase(exc=Exception("Database error"))
+        with patch.object(main_mod, "supabase", fake):
+            success, message = update_account(self.genre_request)
 
         self.assertFalse(success)
         self.assertIn("An exception occurred: Database error", message)
 
 
 class TestValidateUpdateRequest(unittest.TestCase):
-    @patch("main.extract_and_prepare_attributes")
-    @patch("main.check_for_extra_attributes")
-    def test_valid_update_request(self, mock_check_extra, mock_extract):
+    @classmethod
+    def setUpClass(cls):
+        # Patch the validator's helpers once for the whole class; tests set their results
+        patcher = patch.multiple(
+            main_mod,
+            extract_and_prepare_attributes=DEFAULT,
+            check_for_extra_attributes=DEFAULT,
+        )
+        mocks = patcher.start()
+        cls.addClassCleanup(patcher.stop)
+        cls.mock_extract = mocks["extract_and_prepare_attributes"]
+        cls.mock_check_extra = mocks["check_for_extra_attributes"]
+
+    def setUp(self):
+        self.mock_extract.reset_mock(return_value=True)
+        self.mock_check_extra.reset_mock(return_value=True)
+
+    def test_valid_update_request(self):
         # Setup mock responses for a successful validation
-        mock_extract.return_value = ("artist", {"name": "New Artist Name"})
-        mock_check_extra.return_value = (True, "")
+        self.mock_extract.return_value = ("artist", {"name": "New Artist Name"})
+        self.mock_check_extra.return_value = (True, "")
 
         request = {"object_type": "artist", "attributes": {"name": "New Artist Name"}}
         valid, message = validate_update_request(request)
@@ -923,10 +1302,9 @@ class TestValidateUpdateRequest(unittest.TestCase):
         self.assertTrue(valid)
         self.assertEqual(message, "Request is valid.")
 
-    @patch("main.extract_and_prepare_attributes")
-    def test_no_attributes_specified_for_update(self, mock_extract):
+    def test_no_attributes_specified_for_update(self):
         # Simulate no attributes provided for update
-        mock_extract.return_value = ("artist", {})
+        self.mock_extract.return_value = ("artist", {})
 
         request = {"object_type": "artist", "attributes": {}}
         valid, message = validate_update_request(request)
@@ -936,12 +1314,10 @@ class TestValidateUpdateRequest(unittest.TestCase):
             message, "At least one attribute must be specified for update."
         )
 
-    @patch("main.extract_and_prepare_attributes")
-    @patch("main.check_for_extra_attributes")
-    def test_extra_undefined_attributes_provided(self, mock_check_extra, mock_extract):
+    def test_extra_undefined_attributes_provided(self):
         # Simulate extra, undefined attributes provided
-        mock_extract.return_value = ("artist", {"undefined_attr": "value"})
-        mock_check_extra.return_value = (
+        self.mock_extract.return_value = ("artist", {"undefined_attr": "value"})
+        self.mock_check_extra.return_value = (
             False,
             "Additional, undefined attributes cannot be specified.",
         )
@@ -954,17 +1330,13 @@ class TestValidateUpdateRequest(unittest.TestCase):
             message, "Additional, undefined attributes cannot be specified."
         )
 
-    @patch("main.extract_and_prepare_attributes")
-    @patch("main.check_for_extra_attributes")
-    def test_valid_request_with_multiple_attributes(
-        self, mock_check_extra, mock_extract
-    ):
+    def test_valid_request_with_multiple_attributes(self):
         # Setup for a valid request with multiple attributes
-        mock_extract.return_value = (
+        self.mock_extract.return_value = (
             "venue",
             {"location": "New Location", "capacity": 5000},
         )
-        mock_check_extra.return_value = (True, "")
+        self.mock_check_extra.return_value = (True, "")
 
         request = {
             "object_type": "venue",
@@ -977,31 +1349,49 @@ class TestValidateUpdateRequest(unittest.TestCase):
 
 
 class TestDeleteAccount(unittest.TestCase):
-    @patch("main.validate_request")
-    @patch("main.supabase")
-    def test_valid_deactivation_request(self, mock_supabase, mock_validate):
-        mock_validate.return_value = (True, "")
-        mock_result = MagicMock()
-        # Simulating an update operation result
-        mock_result.data = [{"status": "Inactive"}]
-        mock_result.error = None
-        mock_supabase.table().update().eq().execute.return_value = mock_result
-
-        request = {
-            "function": "deactivate",
-            "object_type": "artist",
-            "identifier": "artist_id_123",
-        }
-        success, message = delete_account(request)
-
-        self.assertTrue(success)
-        self.assertEqual(
-            message, "Artist account status updated to 'Inactive' successfully."
-        )
-
-    @patch("main.validate_request")
-    def test_invalid_request_structure(self, mock_validate):
-        mock_validate.return_value = (False, "Invalid request structure")
+    request = {
+        "function": "delete",
+        "object_type": "artist",
+        "identifier": "artist_id_123",
+    }
+    # Keyword arguments for _fake_supabase, paired with the expected result
+    cases = [
+        (
+            {"result": SimpleNamespace(data=[{"status": "Inactive"}], error=None)},
+            (True, "Artist account status updated to 'Inactive' successfully."),
+        ),
+        # No rows affected by the deactivation
+        (
+            {"result": SimpleNamespace(data=[])},
+            (False, "Artist account not found or update failed."),
+        ),
+        # Deactivation is an update, so the failure is raised from the update chain
+        (
+            {"exc": Exception("Database error")},
+            (False, "An exception occurred: Database error"),
+        ),
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        # Patch validation once for the whole class; each test sets the result it needs
+        patcher = patch.object(main_mod, "validate_request")
+        cls.mock_validate = patcher.start()
+        cls.addClassCleanup(patcher.stop)
+
+    def setUp(self):
+        self.mock_validate.reset_mock()
+        self.mock_validate.return_value = (True, "")
+
+    def test_deactivation(self):
+        for fake_kwargs, expected in self.cases:
+            fake = _fake_supabase(**fake_kwargs)
+            with self.subTest(expected=expected):
+                with patch.object(main_mod, "supabase", fake):
+                    self.assertEqual(delete_account(self.request), expected)
+
+    def test_invalid_request_structure(self):
+        self.mock_validate.return_value = (False, "Invalid request structure")
 
         request = {}  # Simulating an invalid request
         success, message = delete_account(request)
@@ -1009,72 +1399,203 @@ class TestDeleteAccount(unittest.TestCase):
         self.assertFalse(success)
         self.assertEqual(message, "Invalid request structure")
 
-    @patch("main.validate_request")
-    @patch("main.supabase")
-    def test_supabase_delete_error(self, mock_supabase, mock_validate):
-        mock_validate.return_value = (True, "")
-        mock_result = MagicMock()
-        # Simulate no rows being affected by the delete operation
-        mock_result.data = []
-        mock_supabase.table().delete().eq().execute.return_value = mock_result
-
-        request = {
-            "function": "delete",
-            "object_type": "artist",
-            "identifier": "artist_id_123",
-        }
-        success, message = delete_account(request)
-
-        self.assertFalse(success)
-        self.assertIn("Artist account not found or update failed.", message)
-
-    @patch("main.validate_request")
-    @patch("main.supabase")
-    def test_exception_during_deactivation_operation(
-        self, mock_supabase, mock_validate
-    ):
-        mock_validate.return_value = (True, "")
-        # Mocking the update operation now instead of delete
-        mock_supabase.table().update().eq().execute.side_effect = Exception(
-            "Database error"
-        )
-
-        request = {
-            "object_type": "artist",
-            "identifier": "artist_id_123",
-        }
-        success, message = delete_account(request)
-
-        self.assertFalse(success)
-        self.assertIn("An exception occurred: Database error", message)
-
 
 class TestFindArtistsByName(unittest.TestCase):
-    @patch("main.supabase")
+    def setUp(self):
+        _artist_candidates.cache_clear()
+
+    @patch.object(main_mod, "supabase")
     def test_exact_match(self, mock_supabase):
         # Mocking database response
-        mock_supabase.table().select().execute.return_value.data = [
-            {"artist_name": "Drake", "user_id": 1}
-        ]
+        mock_supabase.rpc.return_value.execute.return_value = SimpleNamespace(
+            data=[{"artist_name": "Drake", "user_id": 1}]
+        )
         expected = {"artist_name": "Drake", "user_id": 1}
         result = find_artist_by_name("Drake")
         self.assertEqual(result, expected)
 
-    @patch("main.supabase")
+    @patch.object(main_mod, "supabase")
+    def test_falls_back_to_table_without_rpc(self, mock_supabase):
+        mock_supabase.rpc.return_value.execute.side_effect = APIError(
+            {"code": "PGRST202", "message": "Could not find the function"}
+        )
+        select = mock_supabase.table.return_value.select
+        select.return_value.execute.return_value = SimpleNamespace(
+            data=[{"artist_name": "Drake", "user_id": 1}]
+        )
+
+        result = find_artist_by_name("Drke")
+
+        self.assertEqual(result, {"artist_name": "Drake", "user_id": 1})
+        mock_supabase.table.assert_called_once_with("artists")
+        select.assert_called_once_with("user_id, artist_name")
+
+    @patch.object(main_mod, "supabase")
+    def test_other_rpc_errors_raised(self, mock_supabase):
+        mock_supabase.rpc.return_value.execute.side_effect = APIError(
+            {"code": "42501", "message": "permission denied"}
+        )
+        with self.assertRaises(APIError):
+            find_artist_by_name("Drake")
+        mock_supabase.table.assert_not_called()
+
+    @patch.object(main_mod, "supabase")
     def test_no_match(self, mock_supabase):
-        mock_supabase.table().select().execute.return_value.data = [
-            {"artist_name": "Drake", "user_id": 1}
-        ]
+        mock_supabase.rpc.return_value.execute.return_value = SimpleNamespace(
+            data=[{"artist_name": "Drake", "user_id": 1}]
+        )
         result = find_artist_by_name("Metallica")
         self.assertEqual(result, None)
 
-    @patch("main.supabase")
+    @patch.object(main_mod, "supabase")
+    def test_match_after_first_row(self, mock_supabase):
+        mock_supabase.rpc.return_value.execute.return_value = SimpleNamespace(
+            data=[
+                {"artist_name": "Metallica", "user_id": 1},
+                {"artist_name": "Drake", "user_id": 2},
+            ]
+        )
+        result = find_artist_by_name("drake")
+        self.assertEqual(result, {"artist_name": "Drake", "user_id": 2})
+
+    @patch.object(main_mod, "supabase")
+    def test_artists_fetched_once_per_window(self, mock_supabase):
+        mock_supabase.rpc.return_value.execute.return_value = SimpleNamespace(
+            data=[{"artist_name": "Drake", "user_id": 1}]
+        )
+        find_artist_by_name("Drake")
+        find_artist_by_name(" drake ")
+        mock_supabase.rpc.return_value.execute.assert_called_once()
+
+    @patch.object(main_mod, "supabase")
+    def test_candidates_requested_by_trigram_rpc(self, mock_supabase):
+        mock_supabase.rpc.return_value.execute.return_value = SimpleNamespace(data=[])
+        find_artist_by_name("Drke")
+        mock_supabase.rpc.assert_called_with(
+            "search_artists_trgm", {"q": "drke", "k": ARTIST_CANDIDATE_LIMIT}
+        )
+        mock_supabase.table.assert_not_called()
+
+    @patch.object(main_mod, "supabase")
+    def test_no_artists(self, mock_supabase):
+        mock_supabase.rpc.return_value.execute.return_value = SimpleNamespace(data=[])
+        self.assertIsNone(find_artist_by_name("Drake"))
+
+    @patch.object(main_mod, "supabase")
     def test_empty_string(self, mock_supabase):
-        mock_supabase.table().select().execute.return_value.data = [
-            {"artist_name": "Drake", "user_id": 1}
-        ]
+        mock_supabase.rpc.return_value.execute.return_value = SimpleNamespace(
+            data=[{"artist_name": "Drake", "user_id": 1}]
+        )
         result = find_artist_by_name("")
         self.assertEqual(result, None)
+        mock_supabase.rpc.return_value.execute.assert_not_called()
+
+
+class TestJsonResponse(unittest.TestCase):
+    def test_serialises_payload(self):
+        response = _json_response({"message": "Account exists.", "user_id": "123"})
+        self.assertEqual(response.mimetype, "application/json")
+        self.assertEqual(
+            response.get_json(), {"message": "Account exists.", "user_id": "123"}
+        )
+
+
+class TestApiAccount(unittest.TestCase):
+    @patch.object(main_mod, "get_account_info")
+    def test_dispatches_on_function(self, mock_get):
+        mock_get.return_value = {"in_use": False, "message": "Email is not in use."}
+        request = MagicMock()
+        request.get_data.return_value = b'{"function": "get", "object_type": "venue"}'
+
+        response, status = api_account(request)
+
+        self.assertEqual(status, 200)
+        self.assertEqual(response.get_json(), mock_get.return_value)
+        mock_get.assert_called_once_with({"function": "get", "object_type": "venue"})
+
+    def test_invalid_function_rejected(self):
+        request = MagicMock()
+        for function in ["archive", ["get"], None]:
+            with self.subTest(function=function):
+                request.get_data.return_value = orjson.dumps({"function": function})
+                response, status = api_account(request)
+                self.assertEqual(status, 400)
+                self.assertEqual(
+                    response.get_json(), {"error": "Invalid function specified."}
+                )
+
+    def test_non_json_content_type_rejected(self):
+        with app.test_request_context(
+            data='{"function": "get"}', content_type="text/plain"
+        ):
+            response, status = api_account(flask_request)
+        self.assertEqual(status, 400)
+
+    def test_malformed_json_rejected(self):
+        with app.test_request_context(
+            data="{not json", content_type="application/json"
+        ):
+            response, status = api_account(flask_request)
+        self.assertEqual(status, 400)
+        self.assertEqual(
+            response.get_json(), {"error": "Invalid or missing JSON payload"}
+        )
+
+    @patch.object(main_mod, "update_account")
+    def test_single_function_endpoint_rejects_other_functions(self, mock_update):
+        request = MagicMock()
+        request.get_data.return_value = b'{"function": "delete"}'
+
+        response, status = api_update_account(request)
+
+        self.assertEqual(status, 400)
+        self.assertEqual(
+            response.get_json(), {"error": "API only handles update requests"}
+        )
+        mock_update.assert_not_called()
+
+
+class TestApiBulkCreateAccounts(unittest.TestCase):
+    account = {
+        "function": "create",
+        "object_type": "venue",
+        "identifier": "1234456789101112",
+        "attributes": {"email": "testvenue@example.com"},
+    }
+
+    def test_non_object_body_rejected(self):
+        for body in [[self.account], "accounts", 1]:
+            with self.subTest(body=body):
+                with app.test_request_context(json=body):
+                    response, status = api_bulk_create_accounts(flask_request)
+                self.assertEqual(status, 400)
+                self.assertEqual(
+                    response.get_json(),
+                    {"error": "Invalid or missing accounts in JSON payload"},
+                )
+
+    @patch.object(main_mod, "bulk_create_accounts")
+    def test_oversized_batch_rejected(self, mock_bulk):
+        body = {"accounts": [self.account] * (BULK_CREATE_LIMIT + 1)}
+        with app.test_request_context(json=body):
+            response, status = api_bulk_create_accounts(flask_request)
+
+        self.assertEqual(status, 400)
+        self.assertEqual(
+            response.get_json(),
+            {"error": f"At most {BULK_CREATE_LIMIT} accounts can be created at once"},
+        )
+        mock_bulk.assert_not_called()
+
+    @patch.object(main_mod, "bulk_create_accounts")
+    def test_batch_at_limit_accepted(self, mock_bulk):
+        mock_bulk.return_value = [("1", "Account creation was successful.")]
+        body = {"accounts": [self.account] * BULK_CREATE_LIMIT}
+        with app.test_request_context(json=body):
+            response, status = api_bulk_create_accounts(flask_request)
+
+        self.assertEqual(status, 200)
+        mock_bulk.assert_called_once()
 
 
 if __name__ == "__main__":